@@ -90,6 +90,8 @@ WSGI_APPLICATION = 'SMS.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
+# SQLite is the supported backend; migrations use no vendor-specific
+# schema (GIN/BRIN/pg_trgm indexes), so every setup gets the same tables.
 
 DATABASES = {
     'default': {
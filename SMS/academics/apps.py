@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class AcademicsConfig(AppConfig):
     name = 'academics'
+
+    def ready(self):
+        # Connect cache-invalidation receivers for Class / Section.
+        import academics.signals  # noqa: F401
@@ -0,0 +1,32 @@
+# Trigram GIN index on Subject.name (PostgreSQL only). Serves the ILIKE
+# lookups from exam_list's subject__name__icontains search and the admin
+# search_fields.
+
+from django.db import migrations
+
+
+def create_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS subject_name_trgm '
+        'ON academics_subject USING gin (name gin_trgm_ops)'
+    )
+
+
+def drop_trgm_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS subject_name_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trgm_index, drop_trgm_index),
+    ]
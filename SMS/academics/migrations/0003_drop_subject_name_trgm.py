@@ -0,0 +1,15 @@
+# Drop the PostgreSQL-only trigram index added in 0002. SQLite is the
+# supported backend, and schema is kept the same on every database.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_subject_name_trgm'),
+    ]
+
+    operations = [
+        migrations.RunSQL('DROP INDEX IF EXISTS subject_name_trgm', migrations.RunSQL.noop),
+    ]
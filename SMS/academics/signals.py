@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Class, Section
+
+
+CLASS_SECTIONS_CACHE_TIMEOUT = 600
+
+
+def class_sections_cache_key(branch_id):
+    """Cache key for the pre-serialized class -> sections JSON of a branch."""
+    return f'class_sections:{branch_id}'
+
+
+def branch_sections_cache_key(branch_id):
+    """Cache key for the ordered (id, name, class id, class name) section rows of a branch."""
+    return f'branch_sections:{branch_id}'
+
+
+def _invalidate_branch(branch_id):
+    cache.delete_many([class_sections_cache_key(branch_id), branch_sections_cache_key(branch_id)])
+
+
+@receiver(post_save, sender=Class)
+@receiver(post_delete, sender=Class)
+def invalidate_class_sections_for_class(sender, instance, **kwargs):
+    """Drop the cached class/section data when a class changes."""
+    _invalidate_branch(instance.branch_id)
+
+
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+def invalidate_class_sections_for_section(sender, instance, **kwargs):
+    """Drop the cached class/section data when a section changes."""
+    # Resolve the branch without touching instance.class_obj: during a
+    # cascading class delete the parent row may already be gone, in which
+    # case the Class receiver above takes care of the invalidation.
+    branch_id = Class.objects.filter(id=instance.class_obj_id).values_list('branch_id', flat=True).first()
+    if branch_id is not None:
+        _invalidate_branch(branch_id)
@@ -65,6 +65,17 @@ def get_user_school(user, request=None):
         url_school = getattr(request, 'current_school', None)
         if url_school:
             return url_school
+        # Same per-request memo as get_user_branch.
+        if hasattr(request, '_user_school'):
+            return request._user_school
+        request._user_school = _resolve_user_school(user)
+        return request._user_school
+
+    return _resolve_user_school(user)
+
+
+def _resolve_user_school(user):
+    """Look up a user's school from their relationships (no URL context)."""
     try:
         if user.user_type == 'principal':
             return user.owned_school
@@ -106,7 +117,18 @@ def get_user_branch(user, request=None):
         url_branch = getattr(request, 'current_branch', None)
         if url_branch:
             return url_branch
+        # Views and the context processor both resolve the branch; do the
+        # lookup once per request.
+        if hasattr(request, '_user_branch'):
+            return request._user_branch
+        request._user_branch = _resolve_user_branch(user, request)
+        return request._user_branch
+
+    return _resolve_user_branch(user)
+
 
+def _resolve_user_branch(user, request=None):
+    """Look up a user's branch from their relationships (no URL context)."""
     if not user.is_authenticated:
         return None
 
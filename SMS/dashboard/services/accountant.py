@@ -1,4 +1,4 @@
-from django.db.models import Sum, Count, F
+from django.db.models import Sum, Count
 from django.db.models.functions import TruncMonth
 from django.utils import timezone
 from .base import BaseDashboardService
@@ -139,9 +139,7 @@ class AccountantDashboardService(BaseDashboardService):
         defaulters = StudentFee.objects.filter(
             branch=branch,
             status__in=['unpaid', 'partial']
-        ).select_related('student').annotate(
-            balance=F('net_amount') - F('amount_paid')
-        ).order_by('-balance')[:10]
+        ).select_related('student').order_by('-balance')[:10]
         
         return {
             'recent_transactions': recent_transactions,
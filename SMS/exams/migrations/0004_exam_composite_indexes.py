@@ -0,0 +1,37 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_exam_name_trgm'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='exam',
+            name='exams_exam_branch__3efc86_idx',
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['branch', 'is_active', '-date'], name='exams_exam_branch__95c364_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['branch', 'exam_type', '-date'], name='exams_exam_branch__c6c1b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(fields=['section', '-date'], name='exams_exam_section_0c7918_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examattendance',
+            index=models.Index(fields=['exam', 'status'], name='exams_exama_exam_id_eddf41_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='examresult',
+            index=models.Index(fields=['exam', 'is_absent', 'obtained_marks'], name='exams_examr_exam_id_a9832a_idx'),
+        ),
+    ]
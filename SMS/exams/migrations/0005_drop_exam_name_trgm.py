@@ -0,0 +1,15 @@
+# Drop the PostgreSQL-only trigram index added in 0003. SQLite is the
+# supported backend, and schema is kept the same on every database.
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_exam_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL('DROP INDEX IF EXISTS exam_name_trgm', migrations.RunSQL.noop),
+    ]
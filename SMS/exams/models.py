@@ -1,4 +1,5 @@
 import uuid
+from bisect import bisect_right
 
 from django.db import models
 from django.conf import settings
@@ -22,6 +23,11 @@ EXAM_ATTENDANCE_CHOICES = [
     ('leave', 'Leave'),
 ]
 
+# Percentage lower bounds (ascending) and the grade of each resulting band:
+# below 33 -> F, 33+ -> E, ..., 90+ -> A+.
+GRADE_THRESHOLDS = (33, 50, 60, 70, 80, 90)
+GRADE_BANDS = ('F', 'E', 'D', 'C', 'B', 'A', 'A+')
+
 
 class Exam(models.Model):
     """An exam scheduled for a specific subject in a specific section."""
@@ -82,7 +88,9 @@ class Exam(models.Model):
         ordering = ['-date', 'start_time']
         indexes = [
             models.Index(fields=['date', 'section']),
-            models.Index(fields=['branch', 'is_active']),
+            models.Index(fields=['branch', 'is_active', '-date']),
+            models.Index(fields=['branch', 'exam_type', '-date']),
+            models.Index(fields=['section', '-date']),
         ]
 
     def __str__(self):
@@ -134,6 +142,9 @@ class ExamAttendance(models.Model):
         verbose_name_plural = "Exam Attendance"
         unique_together = ['exam', 'student']
         ordering = ['student__first_name']
+        indexes = [
+            models.Index(fields=['exam', 'status']),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.exam.name} - {self.get_status_display()}"
@@ -170,6 +181,9 @@ class ExamResult(models.Model):
         verbose_name_plural = "Exam Results"
         unique_together = ['exam', 'student']
         ordering = ['student__first_name']
+        indexes = [
+            models.Index(fields=['exam', 'is_absent', 'obtained_marks']),
+        ]
 
     def __str__(self):
         return f"{self.student.full_name} - {self.exam.name} - {self.obtained_marks}/{self.exam.total_marks}"
@@ -189,22 +203,9 @@ class ExamResult(models.Model):
         return False
 
     def compute_grade(self):
-        pct = self.percentage
         if self.is_absent:
             return 'AB'
-        if pct >= 90:
-            return 'A+'
-        elif pct >= 80:
-            return 'A'
-        elif pct >= 70:
-            return 'B'
-        elif pct >= 60:
-            return 'C'
-        elif pct >= 50:
-            return 'D'
-        elif pct >= 33:
-            return 'E'
-        return 'F'
+        return GRADE_BANDS[bisect_right(GRADE_THRESHOLDS, self.percentage)]
 
     def save(self, *args, **kwargs):
         if not self.grade:
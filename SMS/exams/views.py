@@ -1,57 +1,106 @@
 import json
+import re
 import uuid
+from collections import defaultdict
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Avg, Count, Q
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Avg, Count, F, FilteredRelation, Max, Prefetch, Q, Sum
 from django.core.exceptions import PermissionDenied
 from django.utils import timezone
 
 from .models import Exam, ExamAttendance, ExamResult, EXAM_TYPE_CHOICES, EXAM_ATTENDANCE_CHOICES
 from .forms import ExamBulkCreateForm, ExamEditForm
 from academics.models import Class, Section, Subject
-from students.models import Student
+from academics.signals import class_sections_cache_key, CLASS_SECTIONS_CACHE_TIMEOUT
+from students.models import Student, Parent
 from staff.models import Teacher
 from accounts.utils import get_user_branch, get_user_school, can_manage_academics, branch_url
 from rbac.services import require_principal_or_manager, require_principal_or_manager_or_permission
 from rbac.permissions import Permissions
 
 
+EXAMS_PER_PAGE = 50
+STUDENT_RESULTS_CACHE_TIMEOUT = 3600
+
+_ROW_FIELD_RE = re.compile(r'^(status|remarks|absent|marks)_(\d+)$')
+
+
 def _dash():
     return redirect('tenants:test_page')
 
 
+def _get_teacher(user):
+    """Active Teacher profile of the user, looked up once per request."""
+    if not hasattr(user, '_active_teacher'):
+        user._active_teacher = Teacher.objects.filter(
+            user=user, is_active=True
+        ).only('id', 'incharge_section_id').first()
+    return user._active_teacher
+
+
 def _can_manage_section(user, section):
     if can_manage_academics(user):
         return True
     if user.user_type == 'teacher':
-        try:
-            t = Teacher.objects.get(user=user, is_active=True)
+        t = _get_teacher(user)
+        if t:
             return t.incharge_section_id == section.id
-        except Teacher.DoesNotExist:
-            pass
     return False
 
 
+def _get_parent_student_ids(user):
+    """IDs of the students linked to a parent user, fetched once per request."""
+    if not hasattr(user, '_parent_student_ids'):
+        user._parent_student_ids = set(
+            Parent.students.through.objects.filter(
+                parent__user=user
+            ).values_list('student_id', flat=True)
+        )
+    return user._parent_student_ids
+
+
 def _can_view_student_results(user, student):
     """Student or their parent can view their own results."""
     if can_manage_academics(user):
         return True
     if user.user_type == 'teacher':
-        try:
-            t = Teacher.objects.get(user=user, is_active=True)
+        t = _get_teacher(user)
+        if t:
             return t.incharge_section_id == student.section_id
-        except Teacher.DoesNotExist:
-            pass
-    if user.user_type == 'student' and hasattr(user, 'student_profile'):
-        return user.student_profile.id == student.id
-    if user.user_type == 'parent' and hasattr(user, 'parent_profile'):
-        return user.parent_profile.students.filter(id=student.id).exists()
+    if user.user_type == 'student':
+        return student.user_id is not None and student.user_id == user.id
+    if user.user_type == 'parent':
+        return student.id in _get_parent_student_ids(user)
     return False
 
 
+def _update_exams(exam, whole_batch, **fields):
+    """
+    Apply ``fields`` to the exam, or to every active exam in its batch, with a
+    single UPDATE. updated_at is set explicitly because update() skips auto_now.
+    """
+    if whole_batch and exam.batch_id:
+        exams = Exam.objects.filter(batch_id=exam.batch_id, is_active=True)
+    else:
+        exams = Exam.objects.filter(pk=exam.pk)
+    return exams.update(updated_at=timezone.now(), **fields)
+
+
+def _rows_from_post(post):
+    """Group '<field>_<student_id>' POST keys into {student_id: {field: value}}."""
+    rows = defaultdict(dict)
+    for key, value in post.items():
+        m = _ROW_FIELD_RE.match(key)
+        if m:
+            rows[int(m.group(2))][m.group(1)] = value
+    return rows
+
+
 # ═══ CRUD ═════════════════════════════════════════════════════════
 
 @login_required
@@ -89,9 +138,10 @@ def exam_list(request):
     sections = Section.objects.filter(class_obj__branch=branch, is_active=True).select_related('class_obj')
     subjects = Subject.objects.filter(branch=branch, is_active=True).order_by('name')
     can_manage = can_manage_academics(request.user)
+    page_obj = Paginator(exams, EXAMS_PER_PAGE).get_page(request.GET.get('page'))
 
     return render(request, 'exams/exam_list.html', {
-        'exams': exams, 'classes': classes,
+        'exams': page_obj, 'page_obj': page_obj, 'classes': classes,
         'sections': sections, 'subjects': subjects,
         'exam_types': EXAM_TYPE_CHOICES,
         'selected_type': et, 'selected_class': cls,
@@ -143,19 +193,27 @@ def create_exam(request):
     else:
         form = ExamBulkCreateForm(branch=branch)
 
-    classes = Class.objects.filter(branch=branch, is_active=True).order_by('numeric_level').prefetch_related('sections')
-    class_sections = {}
-    for c in classes:
-        class_sections[str(c.id)] = list(
-            c.sections.filter(is_active=True).order_by('name').values('id', 'name')
-        )
+    classes = Class.objects.filter(branch=branch, is_active=True).order_by('numeric_level')
+
+    # The class -> sections map only changes when a Class/Section is edited
+    # (see academics.signals), so keep the serialized JSON in the cache.
+    cache_key = class_sections_cache_key(branch.id)
+    class_sections_json = cache.get(cache_key)
+    if class_sections_json is None:
+        class_sections = {str(c.id): [] for c in classes}
+        for sec in Section.objects.filter(
+            class_obj__in=classes, is_active=True
+        ).order_by('name').values('id', 'name', 'class_obj_id'):
+            class_sections[str(sec.pop('class_obj_id'))].append(sec)
+        class_sections_json = json.dumps(class_sections)
+        cache.set(cache_key, class_sections_json, CLASS_SECTIONS_CACHE_TIMEOUT)
 
     selected_classes = request.POST.getlist('classes') if request.method == 'POST' else []
 
     return render(request, 'exams/exam_create.html', {
         'form': form,
         'classes': classes,
-        'class_sections_json': json.dumps(class_sections),
+        'class_sections_json': class_sections_json,
         'selected_classes': selected_classes,
         'title': 'Create Exam',
     })
@@ -191,13 +249,11 @@ def delete_exam(request, exam_id):
     exam = get_object_or_404(Exam, id=exam_id, branch=branch)
 
     if request.method == 'POST':
-        delete_batch = request.POST.get('delete_batch') == 'on'
-        if delete_batch and exam.batch_id:
-            count = Exam.objects.filter(batch_id=exam.batch_id, is_active=True).update(is_active=False)
+        delete_batch = bool(request.POST.get('delete_batch') == 'on' and exam.batch_id)
+        count = _update_exams(exam, delete_batch, is_active=False)
+        if delete_batch:
             messages.success(request, f'{count} exam(s) in the batch deactivated.')
         else:
-            exam.is_active = False
-            exam.save()
             messages.success(request, f'Exam "{exam.name}" deactivated.')
         return redirect(branch_url(request, 'exams:exam_list'))
 
@@ -220,26 +276,54 @@ def exam_detail(request, exam_id):
         Exam.objects.select_related('subject', 'class_obj', 'section', 'created_by'),
         id=exam_id, branch=branch
     )
-    students = Student.objects.filter(section=exam.section, is_active=True).order_by('first_name')
-    attendance = {a.student_id: a for a in ExamAttendance.objects.filter(exam=exam)}
-    results = {r.student_id: r for r in ExamResult.objects.filter(exam=exam)}
+    # One LEFT JOIN query: each student row carries its attendance / result
+    # columns for this exam (both are unique per exam + student).
+    students = Student.objects.filter(section=exam.section, is_active=True).only(
+        'id', 'first_name', 'last_name', 'admission_number'
+    ).annotate(
+        att=FilteredRelation('exam_attendance', condition=Q(exam_attendance__exam=exam)),
+        res=FilteredRelation('exam_results', condition=Q(exam_results__exam=exam)),
+    ).annotate(
+        att_status=F('att__status'),
+        res_id=F('res__id'),
+        res_obtained_marks=F('res__obtained_marks'),
+        res_grade=F('res__grade'),
+        res_is_absent=F('res__is_absent'),
+    ).order_by('first_name')
 
     student_data = []
     for s in students:
+        attendance = None
+        if s.att_status is not None:
+            attendance = ExamAttendance(exam=exam, student=s, status=s.att_status)
+        result = None
+        if s.res_id is not None:
+            result = ExamResult(
+                id=s.res_id, exam=exam, student=s,
+                obtained_marks=s.res_obtained_marks,
+                grade=s.res_grade, is_absent=s.res_is_absent,
+            )
         student_data.append({
             'student': s,
-            'attendance': attendance.get(s.id),
-            'result': results.get(s.id),
+            'attendance': attendance,
+            'result': result,
         })
 
-    stats = ExamResult.objects.filter(exam=exam, is_absent=False, obtained_marks__isnull=False)
-    avg_marks = stats.aggregate(avg=Avg('obtained_marks'))['avg']
-    passed = stats.filter(obtained_marks__gte=exam.passing_marks).count()
-    failed = stats.filter(obtained_marks__lt=exam.passing_marks).count()
-    total_appeared = stats.count()
-    total_students = students.count()
-    att_marked = len(attendance)
-    results_entered = len(results)
+    appeared = Q(is_absent=False, obtained_marks__isnull=False)
+    stats = ExamResult.objects.filter(exam=exam).aggregate(
+        avg=Avg('obtained_marks', filter=appeared),
+        passed=Count('id', filter=appeared & Q(obtained_marks__gte=exam.passing_marks)),
+        failed=Count('id', filter=appeared & Q(obtained_marks__lt=exam.passing_marks)),
+        total=Count('id', filter=appeared),
+        entered=Count('id'),
+    )
+    avg_marks = stats['avg']
+    passed = stats['passed']
+    failed = stats['failed']
+    total_appeared = stats['total']
+    total_students = len(student_data)
+    att_marked = ExamAttendance.objects.filter(exam=exam).count()
+    results_entered = stats['entered']
 
     siblings = exam.sibling_exams.select_related('section', 'class_obj') if exam.batch_id else []
 
@@ -294,9 +378,11 @@ def exam_attendance(request, exam_id):
 
     if request.method == 'POST':
         saved = 0
+        posted = _rows_from_post(request.POST)
         for s in students:
-            status = request.POST.get(f'status_{s.id}', 'present')
-            remark = request.POST.get(f'remarks_{s.id}', '')
+            row = posted.get(s.id, {})
+            status = row.get('status', 'present')
+            remark = row.get('remarks', '')
             ExamAttendance.objects.update_or_create(
                 exam=exam, student=s,
                 defaults={'status': status, 'remarks': remark, 'marked_by': request.user}
@@ -340,10 +426,12 @@ def exam_results_entry(request, exam_id):
 
     if request.method == 'POST':
         saved = 0
+        posted = _rows_from_post(request.POST)
         for s in students:
-            marks_str = request.POST.get(f'marks_{s.id}', '').strip()
-            remark = request.POST.get(f'remarks_{s.id}', '')
-            is_absent = request.POST.get(f'absent_{s.id}') == 'on'
+            row = posted.get(s.id, {})
+            marks_str = row.get('marks', '').strip()
+            remark = row.get('remarks', '')
+            is_absent = row.get('absent') == 'on'
 
             obtained = None
             if not is_absent and marks_str:
@@ -352,18 +440,19 @@ def exam_results_entry(request, exam_id):
                 except (ValueError, TypeError):
                     obtained = None
 
-            obj, _ = ExamResult.objects.update_or_create(
+            # Grade only depends on the marks and this exam, so work it out
+            # up front instead of re-saving each row with update_fields.
+            grade = ExamResult(exam=exam, obtained_marks=obtained, is_absent=is_absent).compute_grade()
+            ExamResult.objects.update_or_create(
                 exam=exam, student=s,
                 defaults={
                     'obtained_marks': obtained,
                     'is_absent': is_absent,
                     'remarks': remark,
                     'entered_by': request.user,
-                    'grade': '',
+                    'grade': grade,
                 }
             )
-            obj.grade = obj.compute_grade()
-            obj.save(update_fields=['grade'])
             saved += 1
 
         messages.success(request, f'Results saved for {saved} student(s).')
@@ -397,13 +486,11 @@ def publish_results(request, exam_id):
     exam = get_object_or_404(Exam, id=exam_id, branch=branch)
 
     if request.method == 'POST':
-        publish_batch = request.POST.get('publish_batch') == 'on'
-        if publish_batch and exam.batch_id:
-            count = Exam.objects.filter(batch_id=exam.batch_id, is_active=True).update(is_published=True)
+        publish_batch = bool(request.POST.get('publish_batch') == 'on' and exam.batch_id)
+        count = _update_exams(exam, publish_batch, is_published=True)
+        if publish_batch:
             messages.success(request, f'Results published for {count} exam(s) in the batch.')
         else:
-            exam.is_published = True
-            exam.save(update_fields=['is_published'])
             messages.success(request, f'Results for "{exam.name}" have been published.')
         return redirect(branch_url(request, 'exams:exam_detail', exam_id=exam.id))
 
@@ -467,43 +554,85 @@ def exam_report(request):
     })
 
 
-@login_required
-def student_result_report(request, student_id):
-    """Individual student's exam results - visible to student, parent, teacher, principal, manager."""
-    student = get_object_or_404(Student, id=student_id)
-
-    if not _can_view_student_results(request.user, student):
-        raise PermissionDenied("You do not have permission to view this student's results.")
-
+def _build_student_result_report(student):
+    """Rows and totals for the student result report."""
     results = ExamResult.objects.filter(
         student=student, exam__is_active=True
-    ).select_related('exam', 'exam__subject').order_by('-exam__date')
-
-    attendance = ExamAttendance.objects.filter(
-        student=student, exam__is_active=True
-    ).select_related('exam').order_by('-exam__date')
+    ).select_related('exam', 'exam__subject').only(
+        'id', 'exam_id', 'student_id', 'obtained_marks', 'grade', 'is_absent',
+        'exam__name', 'exam__exam_type', 'exam__date',
+        'exam__total_marks', 'exam__passing_marks', 'exam__subject__name',
+    ).prefetch_related(
+        Prefetch(
+            'exam__attendance_records',
+            queryset=ExamAttendance.objects.filter(student=student).only('id', 'exam_id', 'status'),
+            to_attr='student_attendance',
+        )
+    ).order_by('-exam__date')
 
-    att_map = {a.exam_id: a for a in attendance}
+    appeared = Q(is_absent=False, obtained_marks__isnull=False)
+    totals = results.aggregate(
+        obtained=Sum('obtained_marks', filter=appeared),
+        max=Sum('exam__total_marks', filter=appeared),
+    )
+    total_obtained = float(totals['obtained'] or 0)
+    total_max = totals['max'] or 0
 
-    result_data = []
-    total_obtained = 0
-    total_max = 0
-    for r in results:
-        result_data.append({
+    result_data = [
+        {
             'result': r,
-            'attendance': att_map.get(r.exam_id),
-        })
-        if r.obtained_marks is not None and not r.is_absent:
-            total_obtained += float(r.obtained_marks)
-            total_max += r.exam.total_marks
+            'attendance': r.exam.student_attendance[0] if r.exam.student_attendance else None,
+        }
+        for r in results
+    ]
 
     overall_pct = round(total_obtained / total_max * 100, 1) if total_max > 0 else 0
 
-    return render(request, 'exams/report_student.html', {
-        'student': student,
+    return {
         'result_data': result_data,
         'overall_pct': overall_pct,
         'total_obtained': total_obtained,
         'total_max': total_max,
+    }
+
+
+@login_required
+def student_result_report(request, student_id):
+    """Individual student's exam results - visible to student, parent, teacher, principal, manager."""
+    student = get_object_or_404(Student.objects.select_related('section__class_obj'), id=student_id)
+
+    if not _can_view_student_results(request.user, student):
+        raise PermissionDenied("You do not have permission to view this student's results.")
+
+    # Results change rarely between views; reuse the computed report until a
+    # result, attendance record, exam or subject of this student is touched.
+    # Results and attendance are aggregated separately so the two relations
+    # aren't joined against each other.
+    results = ExamResult.objects.filter(student=student).aggregate(
+        results=Max('updated_at'),
+        exams=Max('exam__updated_at'),
+        subjects=Max('exam__subject__updated_at'),
+        n_results=Count('id'),
+    )
+    attendance = ExamAttendance.objects.filter(student=student).aggregate(
+        attendance=Max('updated_at'),
+        n_attendance=Count('id'),
+    )
+    sentinel = {**results, **attendance}
+    stamps = [
+        int(sentinel[k].timestamp() * 1_000_000) if sentinel[k] else 0
+        for k in ('results', 'exams', 'subjects', 'attendance')
+    ]
+    cache_key = 'student_results:{}:{}:{}:{}:{}:{}:{}'.format(
+        student.id, *stamps, sentinel['n_results'], sentinel['n_attendance']
+    )
+    report = cache.get(cache_key)
+    if report is None:
+        report = _build_student_result_report(student)
+        cache.set(cache_key, report, STUDENT_RESULTS_CACHE_TIMEOUT)
+
+    return render(request, 'exams/report_student.html', {
+        'student': student,
+        **report,
         'title': f'Results: {student.full_name}',
     })
@@ -6,6 +6,7 @@ from .models import BranchFeeStructure, Scholarship, StudentFee
 class BranchFeeStructureAdmin(admin.ModelAdmin):
     list_display = ['branch', 'frequency', 'monthly_amount', 'yearly_amount', 'yearly_installments', 'installment_amount', 'is_active']
     list_filter = ['frequency', 'is_active', 'branch']
+    list_select_related = ['branch__school']
     readonly_fields = ['installment_amount', 'created_at', 'updated_at']
 
 
@@ -13,6 +14,7 @@ class BranchFeeStructureAdmin(admin.ModelAdmin):
 class ScholarshipAdmin(admin.ModelAdmin):
     list_display = ['name', 'scholarship_type', 'percentage_amount', 'fixed_amount', 'branch', 'is_active', 'start_date']
     list_filter = ['scholarship_type', 'is_active', 'branch']
+    list_select_related = ['branch__school']
     search_fields = ['name']
     readonly_fields = ['created_at', 'updated_at']
 
@@ -21,6 +23,8 @@ class ScholarshipAdmin(admin.ModelAdmin):
 class StudentFeeAdmin(admin.ModelAdmin):
     list_display = ['student', 'label', 'amount', 'scholarship_deduction', 'net_amount', 'amount_paid', 'status', 'due_date']
     list_filter = ['status', 'branch', 'due_date']
+    list_select_related = ['student']
     search_fields = ['student__first_name', 'student__last_name', 'student__admission_number']
+    autocomplete_fields = ['student', 'branch', 'school', 'received_by', 'created_by']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'due_date'
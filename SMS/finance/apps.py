@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class FinanceConfig(AppConfig):
     name = 'finance'
+
+    def ready(self):
+        # Connect cache-invalidation receivers for the finance models.
+        import finance.signals  # noqa: F401
@@ -23,17 +23,20 @@ class BranchFeeStructureForm(forms.ModelForm):
             'yearly_installments': forms.NumberInput(attrs={'placeholder': 'e.g. 3', 'min': 1, 'max': 12}),
         }
 
+    # Layouts are static, so they are built once and shared by every instance.
+    _LAYOUT = Layout(
+        'frequency',
+        Row(Column('monthly_amount', css_class='col-md-6 mb-3')),
+        Row(Column('yearly_amount', css_class='col-md-6 mb-3'), Column('yearly_installments', css_class='col-md-6 mb-3')),
+        'is_active',
+        FormActions(Submit('submit', 'Save Fee Structure', css_class='btn btn-primary btn-lg')),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            'frequency',
-            Row(Column('monthly_amount', css_class='col-md-6 mb-3')),
-            Row(Column('yearly_amount', css_class='col-md-6 mb-3'), Column('yearly_installments', css_class='col-md-6 mb-3')),
-            'is_active',
-            FormActions(Submit('submit', 'Save Fee Structure', css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT
 
     def clean(self):
         cd = super().clean()
@@ -60,22 +63,22 @@ class ScholarshipForm(forms.ModelForm):
             'fixed_amount': forms.NumberInput(attrs={'placeholder': 'Fixed amount in PKR', 'step': '0.01'}),
         }
 
+    _DETAILS = Fieldset('Scholarship Details',
+        Row(Column('name', css_class='col-md-6 mb-3'), Column('scholarship_type', css_class='col-md-6 mb-3')),
+        Row(Column('percentage_amount', css_class='col-md-6 mb-3'), Column('fixed_amount', css_class='col-md-6 mb-3')),
+        Row(Column('start_date', css_class='col-md-4 mb-3'), Column('end_date', css_class='col-md-4 mb-3'), Column('is_active', css_class='col-md-4 mb-3')),
+        'description',
+    )
+    _LAYOUT_CREATE = Layout(_DETAILS, FormActions(Submit('submit', 'Create Scholarship', css_class='btn btn-primary btn-lg')))
+    _LAYOUT_UPDATE = Layout(_DETAILS, FormActions(Submit('submit', 'Update Scholarship', css_class='btn btn-primary btn-lg')))
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if not self.instance.pk:
-            self.fields['start_date'].initial = timezone.now().date()
-        btn_label = 'Update Scholarship' if self.instance.pk else 'Create Scholarship'
+            self.fields['start_date'].initial = timezone.localdate()
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            Fieldset('Scholarship Details',
-                Row(Column('name', css_class='col-md-6 mb-3'), Column('scholarship_type', css_class='col-md-6 mb-3')),
-                Row(Column('percentage_amount', css_class='col-md-6 mb-3'), Column('fixed_amount', css_class='col-md-6 mb-3')),
-                Row(Column('start_date', css_class='col-md-4 mb-3'), Column('end_date', css_class='col-md-4 mb-3'), Column('is_active', css_class='col-md-4 mb-3')),
-                'description',
-            ),
-            FormActions(Submit('submit', btn_label, css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT_UPDATE if self.instance.pk else self._LAYOUT_CREATE
 
     def clean(self):
         cd = super().clean()
@@ -135,41 +138,51 @@ class GenerateFeeForm(forms.Form):
         label="Special Fee Amount (PKR)"
     )
 
+    _LAYOUT = Layout(
+        Fieldset('Fee Type',
+            'fee_type',
+        ),
+        Fieldset('Student Filter',
+            Row(Column('class_filter', css_class='col-md-6 mb-3'), Column('section_filter', css_class='col-md-6 mb-3')),
+        ),
+        Fieldset('Special Fee Details',
+            Row(Column('special_fee_name', css_class='col-md-6 mb-3'), Column('special_fee_amount', css_class='col-md-6 mb-3')),
+            css_id='special-fields',
+        ),
+        Fieldset('Fee Info',
+            Row(Column('due_date', css_class='col-md-4 mb-3'), Column('label', css_class='col-md-4 mb-3'), Column('installment_number', css_class='col-md-4 mb-3', css_id='installment-wrap')),
+        ),
+        FormActions(Submit('generate', 'Generate Fees', css_class='btn btn-primary btn-lg')),
+    )
+
     def __init__(self, *args, branch=None, **kwargs):
         super().__init__(*args, **kwargs)
         if branch:
-            self.fields['class_filter'].queryset = Class.objects.filter(branch=branch, is_active=True).order_by('numeric_level')
-            self.fields['section_filter'].queryset = Section.objects.filter(class_obj__branch=branch, is_active=True).order_by('class_obj__numeric_level', 'name')
+            # Options render "<class> - <branch>" / "<class> - Section <name>";
+            # load just those columns with their relation in the same query.
+            self.fields['class_filter'].queryset = Class.objects.filter(
+                branch=branch, is_active=True
+            ).select_related('branch').only('name', 'numeric_level', 'branch__name').order_by('numeric_level')
+            # Same class filter applied through the join the options need anyway,
+            # so sections of inactive classes aren't offered.
+            self.fields['section_filter'].queryset = Section.objects.filter(
+                class_obj__branch=branch, class_obj__is_active=True, is_active=True
+            ).select_related('class_obj').only('name', 'class_obj__name').order_by('class_obj__numeric_level', 'name')
 
             if 'class_filter' in self.data:
                 try:
                     class_id = int(self.data.get('class_filter'))
                     self.fields['section_filter'].queryset = Section.objects.filter(
                         class_obj_id=class_id, class_obj__branch=branch, is_active=True
-                    ).order_by('name')
+                    ).select_related('class_obj').only('name', 'class_obj__name').order_by('name')
                 except (TypeError, ValueError):
                     pass
         if not self.fields['due_date'].initial:
-            self.fields['due_date'].initial = timezone.now().date()
+            self.fields['due_date'].initial = timezone.localdate()
 
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            Fieldset('Fee Type',
-                'fee_type',
-            ),
-            Fieldset('Student Filter',
-                Row(Column('class_filter', css_class='col-md-6 mb-3'), Column('section_filter', css_class='col-md-6 mb-3')),
-            ),
-            Fieldset('Special Fee Details',
-                Row(Column('special_fee_name', css_class='col-md-6 mb-3'), Column('special_fee_amount', css_class='col-md-6 mb-3')),
-                css_id='special-fields',
-            ),
-            Fieldset('Fee Info',
-                Row(Column('due_date', css_class='col-md-4 mb-3'), Column('label', css_class='col-md-4 mb-3'), Column('installment_number', css_class='col-md-4 mb-3', css_id='installment-wrap')),
-            ),
-            FormActions(Submit('generate', 'Generate Fees', css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT
 
     def clean(self):
         cd = super().clean()
@@ -207,6 +220,11 @@ class RecordPaymentForm(forms.Form):
         label="Notes"
     )
 
+    _LAYOUT = Layout(
+        'payment_type', 'amount', 'notes',
+        FormActions(Submit('pay', 'Record Payment', css_class='btn btn-success btn-lg')),
+    )
+
     def __init__(self, *args, max_amount=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.max_amount = max_amount
@@ -215,10 +233,7 @@ class RecordPaymentForm(forms.Form):
             self.fields['amount'].widget.attrs['max'] = str(max_amount)
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            'payment_type', 'amount', 'notes',
-            FormActions(Submit('pay', 'Record Payment', css_class='btn btn-success btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT
 
     def clean_amount(self):
         amount = self.cleaned_data.get('amount')
@@ -253,16 +268,18 @@ class EditSpecialFeeForm(forms.Form):
         label="Due Date"
     )
 
+    _LAYOUT = Layout(
+        Row(Column('special_fee_name', css_class='col-md-4 mb-3'),
+            Column('amount', css_class='col-md-4 mb-3'),
+            Column('due_date', css_class='col-md-4 mb-3')),
+        FormActions(Submit('save', 'Update Special Fee', css_class='btn btn-primary btn-lg')),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            Row(Column('special_fee_name', css_class='col-md-4 mb-3'),
-                Column('amount', css_class='col-md-4 mb-3'),
-                Column('due_date', css_class='col-md-4 mb-3')),
-            FormActions(Submit('save', 'Update Special Fee', css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT
 
 
 class ExpenseForm(forms.ModelForm):
@@ -276,22 +293,24 @@ class ExpenseForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'rows': 3, 'class': 'form-control', 'placeholder': 'Optional details'}),
         }
 
+    _FIELDS = (
+        Row(Column('title', css_class='col-md-6 mb-3'), Column('category', css_class='col-md-6 mb-3')),
+        Row(Column('amount', css_class='col-md-6 mb-3'), Column('expense_date', css_class='col-md-6 mb-3')),
+        'description',
+    )
+    _LAYOUT_CREATE = Layout(*_FIELDS, FormActions(Submit('submit', 'Add Expense', css_class='btn btn-primary btn-lg')))
+    _LAYOUT_UPDATE = Layout(*_FIELDS, FormActions(Submit('submit', 'Update Expense', css_class='btn btn-primary btn-lg')))
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if not self.instance.pk:
-            self.fields['expense_date'].initial = timezone.now().date()
-        btn_label = 'Update Expense' if self.instance.pk else 'Add Expense'
+            self.fields['expense_date'].initial = timezone.localdate()
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            Row(Column('title', css_class='col-md-6 mb-3'), Column('category', css_class='col-md-6 mb-3')),
-            Row(Column('amount', css_class='col-md-6 mb-3'), Column('expense_date', css_class='col-md-6 mb-3')),
-            'description',
-            FormActions(Submit('submit', btn_label, css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT_UPDATE if self.instance.pk else self._LAYOUT_CREATE
 
 
-MONTH_CHOICES = [(i, calendar.month_name[i]) for i in range(1, 13)]
+MONTH_CHOICES = tuple((i, calendar.month_name[i]) for i in range(1, 13))
 
 
 class GenerateSalaryForm(forms.Form):
@@ -308,6 +327,11 @@ class GenerateSalaryForm(forms.Form):
         label="Year"
     )
 
+    _LAYOUT = Layout(
+        Row(Column('month', css_class='col-md-6 mb-3'), Column('year', css_class='col-md-6 mb-3')),
+        FormActions(Submit('generate', 'Generate Salary Records', css_class='btn btn-primary btn-lg')),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         now = timezone.now()
@@ -315,10 +339,7 @@ class GenerateSalaryForm(forms.Form):
         self.fields['year'].initial = now.year
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            Row(Column('month', css_class='col-md-6 mb-3'), Column('year', css_class='col-md-6 mb-3')),
-            FormActions(Submit('generate', 'Generate Salary Records', css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT
 
 
 class EditSalaryForm(forms.Form):
@@ -335,11 +356,13 @@ class EditSalaryForm(forms.Form):
         label="Notes"
     )
 
+    _LAYOUT = Layout(
+        Row(Column('salary_amount', css_class='col-md-6 mb-3'), Column('description', css_class='col-md-6 mb-3')),
+        FormActions(Submit('save', 'Update Salary', css_class='btn btn-primary btn-lg')),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.helper = FormHelper()
         self.helper.form_method = 'post'
-        self.helper.layout = Layout(
-            Row(Column('salary_amount', css_class='col-md-6 mb-3'), Column('description', css_class='col-md-6 mb-3')),
-            FormActions(Submit('save', 'Update Salary', css_class='btn btn-primary btn-lg')),
-        )
+        self.helper.layout = self._LAYOUT
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0003_expense_salaryrecord'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='branchfeestructure',
+            index=models.Index(fields=['branch', 'is_active'], name='finance_bra_branch__f7f84c_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0004_fee_structure_branch_active_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['branch', 'is_active'], name='finance_sch_branch__6ba4d9_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='branchfeestructure',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_active', True)), fields=('branch',), name='uniq_active_feestruct_per_branch'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0005_active_fee_structure_constraint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(condition=models.Q(('status__in', ['unpaid', 'partial'])), fields=['branch', 'due_date'], name='idx_fees_outstanding'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0007_fee_structure_base_manager'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='studentfee',
+            options={'ordering': ['-due_date', 'id'], 'verbose_name': 'Student Fee', 'verbose_name_plural': 'Student Fees'},
+        ),
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(fields=['-due_date', 'id'], name='idx_fee_due_id'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0008_studentfee_due_id_ordering'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='salaryrecord',
+            name='finance_sal_branch__e35f13_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='studentfee',
+            name='finance_stu_branch__ca4a48_idx',
+        ),
+        migrations.AddIndex(
+            model_name='salaryrecord',
+            index=models.Index(fields=['branch', 'year', 'month', 'status'], name='salary_branch_period_status'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(fields=['branch', 'status', '-due_date'], name='fee_branch_status_due'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:54
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0009_fee_salary_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studentfee',
+            name='balance',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('net_amount'), '-', models.F('amount_paid')), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Balance (PKR)'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(condition=models.Q(('status__in', ['unpaid', 'partial'])), fields=['branch', 'balance'], name='idx_fees_outstanding_balance'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.1.2 on 2026-10-15 22:58
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+def restore_net_amount(apps, schema_editor):
+    StudentFee = apps.get_model('finance', 'StudentFee')
+    StudentFee.objects.update(net_amount=models.F('amount') - models.F('scholarship_deduction'))
+
+
+class Migration(migrations.Migration):
+    # Generated columns can't be altered in place: drop balance (and its
+    # index) and net_amount, then add both back as generated columns.
+    # net_amount is recomputed from amount - scholarship_deduction.
+    # Reversing re-adds the plain net_amount column on existing rows, so it
+    # gets a default first and its values are restored from the same formula.
+
+    dependencies = [
+        ('finance', '0010_studentfee_balance_generated'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='studentfee',
+            name='net_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Net Amount (PKR)'),
+        ),
+        migrations.RunPython(migrations.RunPython.noop, restore_net_amount),
+        migrations.RemoveIndex(
+            model_name='studentfee',
+            name='idx_fees_outstanding_balance',
+        ),
+        migrations.RemoveField(
+            model_name='studentfee',
+            name='balance',
+        ),
+        migrations.RemoveField(
+            model_name='studentfee',
+            name='net_amount',
+        ),
+        migrations.AddField(
+            model_name='studentfee',
+            name='net_amount',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('amount'), '-', models.F('scholarship_deduction')), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Net Amount (PKR)'),
+        ),
+        migrations.AddField(
+            model_name='studentfee',
+            name='balance',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('amount'), '-', models.F('scholarship_deduction')), '-', models.F('amount_paid')), output_field=models.DecimalField(decimal_places=2, max_digits=10), verbose_name='Balance (PKR)'),
+        ),
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(condition=models.Q(('status__in', ['unpaid', 'partial'])), fields=['branch', 'balance'], name='idx_fees_outstanding_balance'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-15 23:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0011_studentfee_net_amount_generated'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='expense',
+            name='branch',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='expenses', to='tenants.branch', verbose_name='Branch'),
+        ),
+        migrations.AlterField(
+            model_name='salaryrecord',
+            name='branch',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='salary_records', to='tenants.branch', verbose_name='Branch'),
+        ),
+        migrations.AlterField(
+            model_name='studentfee',
+            name='branch',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='student_fees', to='tenants.branch', verbose_name='Branch'),
+        ),
+        migrations.AlterField(
+            model_name='studentfee',
+            name='student',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='fees', to='students.student', verbose_name='Student'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-15 23:04
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0012_fk_indexes_covered_by_composites'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='salaryrecord',
+            options={'ordering': ['-year', '-month', 'employee_id'], 'verbose_name': 'Salary Record', 'verbose_name_plural': 'Salary Records'},
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-15 23:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0013_salaryrecord_ordering_employee_id'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='studentfee',
+            name='finance_stu_due_dat_e9a046_idx',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-15 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0014_drop_redundant_due_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='studentfee',
+            index=models.Index(condition=models.Q(('fee_type', 'special')), fields=['branch', '-due_date'], name='idx_fees_special'),
+        ),
+    ]
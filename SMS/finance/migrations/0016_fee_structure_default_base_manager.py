@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-15 23:29
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finance', '0015_studentfee_special_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='branchfeestructure',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Branch Fee Structure', 'verbose_name_plural': 'Branch Fee Structures'},
+        ),
+    ]
@@ -1,7 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Concat, Least
 from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
 from django.utils import timezone
 from decimal import Decimal
+import calendar
 
 
 FREQUENCY_CHOICES = [
@@ -43,6 +47,82 @@ SALARY_STATUS_CHOICES = [
     ('paid', 'Paid'),
 ]
 
+# Shared Decimal constants for the money arithmetic below.
+_ZERO = Decimal('0')
+_CENT = Decimal('0.01')
+
+# Valid stored values, for checking filter input without scanning the choice lists.
+FEE_STATUS_KEYS = frozenset(k for k, _ in FEE_STATUS_CHOICES)
+FEE_TYPE_KEYS = frozenset(k for k, _ in FEE_TYPE_CHOICES)
+EXPENSE_CATEGORY_KEYS = frozenset(k for k, _ in EXPENSE_CATEGORY_CHOICES)
+SALARY_STATUS_KEYS = frozenset(k for k, _ in SALARY_STATUS_CHOICES)
+
+# Label lookups for __str__; get_FOO_display() rebuilds its dict on every call.
+_FEE_STATUS_DISPLAY = dict(FEE_STATUS_CHOICES)
+_MONTH_NAMES = tuple(calendar.month_name)  # index 0 is ''
+
+
+# user_type -> label, filled on first use from the user model's choices.
+_ROLE_LABELS = {}
+
+
+def _role_label(user):
+    """
+    Role label stored in the received_by_role / paid_by_role snapshots.
+    Same text as user.get_user_type_display(), without rebuilding the
+    choices dict on every payment.
+    """
+    if not _ROLE_LABELS:
+        _ROLE_LABELS.update(user._meta.get_field('user_type').flatchoices)
+    return _ROLE_LABELS.get(user.user_type, user.user_type)
+
+
+ACTIVE_FEE_STRUCTURE_CACHE_TIMEOUT = 300
+
+FINANCE_DASHBOARD_CACHE_TIMEOUT = 30
+
+
+def finance_dashboard_cache_key(branch_id):
+    """Cache key for the finance dashboard KPIs of a branch."""
+    return f'fin:dash:{branch_id}'
+
+
+def invalidate_finance_dashboard(branch_id):
+    """Drop the branch's cached dashboard KPIs (and their rendered cards) after a write."""
+    cache.delete_many([
+        finance_dashboard_cache_key(branch_id),
+        make_template_fragment_key('fin_dash_kpis', [branch_id]),
+    ])
+
+
+# Fee generation reads students GENERATE_CHUNK_SIZE rows at a time and
+# inserts fees GENERATE_BATCH_SIZE rows per INSERT.
+GENERATE_CHUNK_SIZE = 2000
+GENERATE_BATCH_SIZE = 500
+
+
+def active_fee_structure_cache_key(branch_id):
+    """Cache key for the active BranchFeeStructure of a branch."""
+    return f'feestruct:active:{branch_id}'
+
+
+def _percentage_of_cents(amount_cents, pct_bp):
+    """
+    `pct_bp` basis points of `amount_cents`, rounded half-to-even to whole cents
+    (the same result as Decimal.quantize on the exact value, in plain ints).
+    """
+    cents, rem = divmod(amount_cents * pct_bp, 10000)
+    if rem * 2 > 10000 or (rem * 2 == 10000 and cents % 2):
+        cents += 1
+    return cents
+
+
+class BranchFeeStructureManager(models.Manager):
+    """Joins the branch up front; __str__ renders branch.name."""
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('branch')
+
 
 class BranchFeeStructure(models.Model):
     """
@@ -86,31 +166,66 @@ class BranchFeeStructure(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BranchFeeStructureManager()
+
     class Meta:
         verbose_name = "Branch Fee Structure"
         verbose_name_plural = "Branch Fee Structures"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['branch', 'is_active']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['branch'], condition=models.Q(is_active=True),
+                name='uniq_active_feestruct_per_branch',
+            ),
+        ]
 
     def __str__(self):
         if self.frequency == 'monthly':
             return f"{self.branch.name} - Monthly: PKR {self.monthly_amount}"
         return f"{self.branch.name} - Yearly: PKR {self.yearly_amount} ({self.yearly_installments} installments)"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
     def save(self, *args, **kwargs):
         if self.frequency == 'yearly' and self.yearly_amount and self.yearly_installments:
-            self.installment_amount = (self.yearly_amount / Decimal(self.yearly_installments)).quantize(Decimal('0.01'))
-        if self.is_active:
-            BranchFeeStructure.objects.filter(
-                branch=self.branch, is_active=True
-            ).exclude(pk=self.pk).update(is_active=False)
-        super().save(*args, **kwargs)
+            self.installment_amount = (self.yearly_amount / Decimal(self.yearly_installments)).quantize(_CENT)
+        # Only a structure becoming active needs to retire the others; do both
+        # writes in one transaction so the branch never has zero or two active.
+        # Instances not loaded via from_db (built with a pk, bulk_create) have
+        # no loaded state and are treated as becoming active.
+        with transaction.atomic():
+            if self.is_active and (self._state.adding or not getattr(self, '_loaded_is_active', None)):
+                BranchFeeStructure.objects.filter(
+                    branch_id=self.branch_id, is_active=True
+                ).exclude(pk=self.pk).update(is_active=False)
+            super().save(*args, **kwargs)
+        self._loaded_is_active = self.is_active
+
+    @classmethod
+    def get_active(cls, branch_id):
+        """
+        The branch's active structure (or None), cached per branch. Cleared by
+        finance.signals whenever a structure of the branch is saved or deleted.
+        """
+        return cache.get_or_set(
+            active_fee_structure_cache_key(branch_id),
+            lambda: cls.objects.select_related(None).filter(branch_id=branch_id, is_active=True).first(),
+            ACTIVE_FEE_STRUCTURE_CACHE_TIMEOUT,
+        )
 
     @property
     def per_fee_amount(self):
         """The amount charged per fee generation."""
         if self.frequency == 'monthly':
-            return self.monthly_amount or Decimal('0')
-        return self.installment_amount or Decimal('0')
+            return self.monthly_amount or _ZERO
+        return self.installment_amount or _ZERO
 
 
 class Scholarship(models.Model):
@@ -159,6 +274,9 @@ class Scholarship(models.Model):
         verbose_name = "Scholarship"
         verbose_name_plural = "Scholarships"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['branch', 'is_active']),
+        ]
 
     def __str__(self):
         if self.scholarship_type == 'percentage':
@@ -172,15 +290,56 @@ class Scholarship(models.Model):
         For fixed: the fixed amount directly (capped at fee_amount)
         """
         if self.scholarship_type == 'percentage' and self.percentage_amount:
-            return (fee_amount * self.percentage_amount / Decimal('100')).quantize(Decimal('0.01'))
+            cents = _percentage_of_cents(int(fee_amount * 100), int(self.percentage_amount * 100))
+            return Decimal(cents).scaleb(-2)
         elif self.scholarship_type == 'fixed' and self.fixed_amount:
             return min(self.fixed_amount, fee_amount)
-        return Decimal('0')
+        return _ZERO
+
+
+class StudentFeeQuerySet(models.QuerySet):
+    def totals(self, **extra):
+        """
+        Billed/collected/outstanding sums and per-status counts for the
+        queryset, computed in a single aggregate query. `extra` adds more
+        aggregates to the same query.
+        """
+        return self.aggregate(
+            **extra,
+            count=models.Count('id'),
+            billed=models.Sum('net_amount', default=_ZERO),
+            collected=models.Sum('amount_paid', filter=models.Q(status__in=['paid', 'partial']), default=_ZERO),
+            outstanding=models.Sum('balance', filter=~models.Q(status='paid'), default=_ZERO),
+            scholarship=models.Sum('scholarship_deduction', default=_ZERO),
+            paid_count=models.Count('id', filter=models.Q(status='paid')),
+            partial_count=models.Count('id', filter=models.Q(status='partial')),
+            unpaid_count=models.Count('id', filter=models.Q(status='unpaid')),
+        )
 
 
 class StudentFee(models.Model):
     """A single generated fee instance for a student."""
 
+    # Relations the fee list and the single-fee pages render; views join
+    # these up front instead of each listing its own.
+    LIST_SELECT_RELATED = ('student', 'student__section', 'student__section__class_obj')
+    DETAIL_SELECT_RELATED = LIST_SELECT_RELATED + ('received_by', 'fee_structure', 'created_by', 'branch', 'school')
+    # Columns the fee list table renders (used with .only()).
+    LIST_FIELDS = (
+        'fee_type', 'label', 'amount', 'scholarship_deduction', 'net_amount', 'amount_paid',
+        'balance', 'status', 'due_date',
+        'student__first_name', 'student__last_name',
+        'student__section__name', 'student__section__class_obj__name',
+    )
+    # Columns the fee detail page renders, for the same reason.
+    DETAIL_FIELDS = LIST_FIELDS + (
+        'paid_date', 'notes', 'received_by_role',
+        'student__admission_number', 'student__father_name',
+        'student__scholarship__name', 'student__scholarship__scholarship_type',
+        'student__scholarship__percentage_amount', 'student__scholarship__fixed_amount',
+        'received_by__full_name', 'created_by__full_name',
+    )
+
     fee_type = models.CharField(
         max_length=10, choices=FEE_TYPE_CHOICES, default='academic',
         verbose_name="Fee Type"
@@ -188,7 +347,8 @@ class StudentFee(models.Model):
 
     student = models.ForeignKey(
         'students.Student', on_delete=models.CASCADE,
-        related_name='fees', verbose_name="Student"
+        related_name='fees', verbose_name="Student",
+        db_index=False,  # leading column of the (student, status) index
     )
     fee_structure = models.ForeignKey(
         BranchFeeStructure, on_delete=models.SET_NULL,
@@ -197,7 +357,8 @@ class StudentFee(models.Model):
 
     branch = models.ForeignKey(
         'tenants.Branch', on_delete=models.CASCADE,
-        related_name='student_fees', verbose_name="Branch"
+        related_name='student_fees', verbose_name="Branch",
+        db_index=False,  # leading column of fee_branch_status_due
     )
     school = models.ForeignKey(
         'tenants.SchoolTenant', on_delete=models.CASCADE,
@@ -209,8 +370,20 @@ class StudentFee(models.Model):
         max_digits=10, decimal_places=2, default=0,
         verbose_name="Scholarship Deduction (PKR)"
     )
-    net_amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Net Amount (PKR)")
+    # Derived columns are computed and stored by the database. PostgreSQL
+    # doesn't let one generated column reference another, so balance
+    # spells out net_amount.
+    net_amount = models.GeneratedField(
+        expression=models.F('amount') - models.F('scholarship_deduction'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True, verbose_name="Net Amount (PKR)",
+    )
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Amount Paid (PKR)")
+    balance = models.GeneratedField(
+        expression=models.F('amount') - models.F('scholarship_deduction') - models.F('amount_paid'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True, verbose_name="Balance (PKR)",
+    )
 
     status = models.CharField(max_length=10, choices=FEE_STATUS_CHOICES, default='unpaid', verbose_name="Status")
 
@@ -241,36 +414,128 @@ class StudentFee(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudentFeeQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Student Fee"
         verbose_name_plural = "Student Fees"
-        ordering = ['-due_date', 'student__first_name']
+        # Name order would join students on every query; pages that want it
+        # (fee_list) order by student__first_name explicitly.
+        ordering = ['-due_date', 'id']
         indexes = [
             models.Index(fields=['student', 'status']),
-            models.Index(fields=['branch', 'status']),
-            models.Index(fields=['due_date']),
+            models.Index(fields=['branch', 'status', '-due_date'], name='fee_branch_status_due'),
+            models.Index(fields=['-due_date', 'id'], name='idx_fee_due_id'),
+            models.Index(
+                fields=['branch', 'due_date'], condition=models.Q(status__in=['unpaid', 'partial']),
+                name='idx_fees_outstanding',
+            ),
+            models.Index(
+                fields=['branch', 'balance'], condition=models.Q(status__in=['unpaid', 'partial']),
+                name='idx_fees_outstanding_balance',
+            ),
+            # Special fees are a small slice of a branch; fee_list's
+            # ?fee_type=special filter reads them in due-date order.
+            models.Index(
+                fields=['branch', '-due_date'], condition=models.Q(fee_type='special'),
+                name='idx_fees_special',
+            ),
         ]
 
     def __str__(self):
-        return f"{self.student} - {self.label or self.due_date} - {self.get_status_display()}"
+        return f"{self.student} - {self.label or self.due_date} - {_FEE_STATUS_DISPLAY.get(self.status, self.status)}"
 
-    @property
-    def balance(self):
-        return self.net_amount - self.amount_paid
-
-    def record_payment(self, amount, received_by=None):
-        """Record a payment towards this fee."""
-        self.amount_paid += Decimal(str(amount))
-        if self.amount_paid >= self.net_amount:
-            self.amount_paid = self.net_amount
-            self.status = 'paid'
-            self.paid_date = timezone.now().date()
-        else:
-            self.status = 'partial'
+    def record_payment(self, amount, received_by=None, notes=''):
+        """
+        Record a payment towards this fee, appending `notes` if given.
+        The new total is computed by a single UPDATE on the row (F()
+        expressions), so concurrent payments can't overwrite each other.
+        """
+        if not isinstance(amount, Decimal):
+            amount = Decimal(str(amount))
+        total = models.F('amount_paid') + amount
+        settled = models.Q(net_amount__lte=total)
+        updates = {
+            'amount_paid': Least(total, models.F('net_amount')),
+            'status': models.Case(models.When(settled, then=models.Value('paid')), default=models.Value('partial')),
+            'paid_date': models.Case(
+                models.When(settled, then=models.Value(timezone.localdate())), default=models.F('paid_date'),
+            ),
+            'updated_at': timezone.now(),
+        }
         if received_by:
-            self.received_by = received_by
-            self.received_by_role = received_by.get_user_type_display()
-        self.save()
+            updates['received_by'] = received_by
+            updates['received_by_role'] = _role_label(received_by)
+        if notes:
+            updates['notes'] = models.Case(
+                models.When(notes='', then=models.Value(notes)),
+                default=Concat(models.F('notes'), models.Value('\n' + notes)),
+                output_field=models.TextField(),
+            )
+        StudentFee.objects.filter(pk=self.pk).update(**updates)
+        self.refresh_from_db(fields=[*updates, 'balance'])
+        invalidate_finance_dashboard(self.branch_id)
+
+    @classmethod
+    def generate_for_students(cls, students, branch, school, due_date, fee_structure=None,
+                              fee_type='academic', label='', installment_number=None,
+                              special_amount=None, created_by=None):
+        """
+        Create one fee per student in the `students` queryset and return how
+        many were created.
+        Academic fees use fee_structure.per_fee_amount minus each student's
+        active scholarship; special fees charge `special_amount` with no
+        deduction.
+        Students are streamed as (id, scholarship_id) rows and fees inserted
+        in batches, so memory stays flat for whole-branch runs.
+        Runs in one transaction; academic runs lock the fee structure row so
+        concurrent generators for the same branch are serialized.
+        """
+        special = fee_type == 'special'
+        with transaction.atomic():
+            if special:
+                fee_structure = None
+                amount = special_amount
+                deductions = {}
+            else:
+                fee_structure = BranchFeeStructure.objects.select_related(None).select_for_update().get(
+                    pk=fee_structure.pk
+                )
+                amount = fee_structure.per_fee_amount
+                # Every student is charged the same amount, so each active
+                # scholarship's deduction only needs computing once per run.
+                scholarships = Scholarship.objects.filter(
+                    pk__in=students.values('scholarship_id'), is_active=True
+                ).only('scholarship_type', 'percentage_amount', 'fixed_amount')
+                deductions = {s.pk: s.calculate_deduction(amount) for s in scholarships}
+
+            fees = []
+            created = 0
+            rows = students.values_list('pk', 'scholarship_id').iterator(chunk_size=GENERATE_CHUNK_SIZE)
+            for student_id, scholarship_id in rows:
+                deduction = deductions.get(scholarship_id, _ZERO)
+                fees.append(cls(
+                    fee_type=fee_type,
+                    student_id=student_id,
+                    fee_structure=fee_structure,
+                    branch=branch,
+                    school=school,
+                    amount=amount,
+                    scholarship_deduction=deduction,
+                    due_date=due_date,
+                    label=label,
+                    installment_number=None if special else installment_number,
+                    created_by=created_by,
+                ))
+                if len(fees) == GENERATE_BATCH_SIZE:
+                    cls.objects.bulk_create(fees)
+                    created += len(fees)
+                    fees = []
+            if fees:
+                cls.objects.bulk_create(fees)
+                created += len(fees)
+        invalidate_finance_dashboard(branch.pk)
+        return created
 
 
 class Expense(models.Model):
@@ -278,7 +543,8 @@ class Expense(models.Model):
 
     branch = models.ForeignKey(
         'tenants.Branch', on_delete=models.CASCADE,
-        related_name='expenses', verbose_name="Branch"
+        related_name='expenses', verbose_name="Branch",
+        db_index=False,  # leading column of the (branch, expense_date) index
     )
     school = models.ForeignKey(
         'tenants.SchoolTenant', on_delete=models.CASCADE,
@@ -311,6 +577,15 @@ class Expense(models.Model):
         return f"{self.title} - PKR {self.amount} ({self.get_category_display()})"
 
 
+class SalaryRecordManager(models.Manager):
+    """
+    Selects the employee with every record: __str__ renders its name.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().select_related('employee')
+
+
 class SalaryRecord(models.Model):
     """
     Monthly salary record for each employee.
@@ -319,7 +594,8 @@ class SalaryRecord(models.Model):
 
     branch = models.ForeignKey(
         'tenants.Branch', on_delete=models.CASCADE,
-        related_name='salary_records', verbose_name="Branch"
+        related_name='salary_records', verbose_name="Branch",
+        db_index=False,  # leading column of salary_branch_period_status
     )
     school = models.ForeignKey(
         'tenants.SchoolTenant', on_delete=models.CASCADE,
@@ -354,13 +630,16 @@ class SalaryRecord(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = SalaryRecordManager()
+
     class Meta:
         verbose_name = "Salary Record"
         verbose_name_plural = "Salary Records"
-        ordering = ['-year', '-month', 'employee__full_name']
+        # No join in the default order; lists sort by employee__full_name explicitly.
+        ordering = ['-year', '-month', 'employee_id']
         unique_together = ['employee', 'month', 'year']
         indexes = [
-            models.Index(fields=['branch', 'month', 'year']),
+            models.Index(fields=['branch', 'year', 'month', 'status'], name='salary_branch_period_status'),
             models.Index(fields=['status']),
         ]
 
@@ -368,10 +647,54 @@ class SalaryRecord(models.Model):
         return f"{self.employee.full_name} - {self.get_month_display()} {self.year} - {self.get_status_display()}"
 
     def get_month_display(self):
-        import calendar
-        return calendar.month_name[self.month]
+        return _MONTH_NAMES[self.month]
 
     @property
     def month_year_label(self):
-        import calendar
-        return f"{calendar.month_name[self.month]} {self.year}"
+        return f"{_MONTH_NAMES[self.month]} {self.year}"
+
+    @classmethod
+    def generate_for_month(cls, branch, school, month, year, employees, created_by=None):
+        """
+        Create the month's salary records for `employees` (dicts with
+        'user', 'type', 'salary') with one bulk_create. Employees that already
+        have a record for the month are skipped. Returns (created, skipped).
+        """
+        users = [emp['user'] for emp in employees if emp['user']]
+        seen = set(cls.objects.filter(
+            employee__in=users, month=month, year=year
+        ).values_list('employee_id', flat=True))
+        records = []
+        for emp in employees:
+            if not emp['user']:
+                continue
+            if emp['user'].pk in seen:
+                continue
+            seen.add(emp['user'].pk)
+            records.append(cls(
+                branch=branch, school=school,
+                employee=emp['user'],
+                employee_type=emp['type'],
+                salary_amount=emp['salary'],
+                month=month, year=year,
+                created_by=created_by,
+            ))
+        cls.objects.bulk_create(records, batch_size=500)
+        if records:
+            invalidate_finance_dashboard(branch.pk)
+        return len(records), len(users) - len(records)
+
+    @classmethod
+    def mark_paid(cls, queryset, paid_by):
+        """Mark the unpaid records in `queryset` as paid with one UPDATE; returns the count."""
+        count = queryset.filter(status='unpaid').update(
+            status='paid',
+            payment_date=timezone.localdate(),
+            paid_by=paid_by,
+            paid_by_role=_role_label(paid_by),
+            updated_at=timezone.now(),
+        )
+        if count:
+            for branch_id in queryset.values_list('branch_id', flat=True).distinct():
+                invalidate_finance_dashboard(branch_id)
+        return count
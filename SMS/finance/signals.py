@@ -0,0 +1,32 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import (
+    BranchFeeStructure, Scholarship, StudentFee, Expense, SalaryRecord,
+    active_fee_structure_cache_key, invalidate_finance_dashboard,
+)
+
+
+@receiver(post_save, sender=BranchFeeStructure)
+@receiver(post_delete, sender=BranchFeeStructure)
+def invalidate_active_fee_structure(sender, instance, **kwargs):
+    """Drop the cached active structure and its dashboard card when a structure of the branch changes."""
+    cache.delete_many([
+        active_fee_structure_cache_key(instance.branch_id),
+        make_template_fragment_key('fin_fee_struct', [instance.branch_id]),
+    ])
+
+
+@receiver(post_save, sender=StudentFee)
+@receiver(post_delete, sender=StudentFee)
+@receiver(post_save, sender=Scholarship)
+@receiver(post_delete, sender=Scholarship)
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+@receiver(post_save, sender=SalaryRecord)
+@receiver(post_delete, sender=SalaryRecord)
+def invalidate_dashboard_kpis(sender, instance, **kwargs):
+    """Drop the cached finance dashboard KPIs of the row's branch."""
+    invalidate_finance_dashboard(instance.branch_id)
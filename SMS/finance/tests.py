@@ -1,3 +1,201 @@
+import datetime
+from decimal import Decimal
+
 from django.test import TestCase
+from django.utils import timezone
+from accounts.models import CustomUser
+from tenants.models import SchoolTenant, Branch
+from students.models import Student
+from academics.models import Class, Section
+from finance.models import BranchFeeStructure, Scholarship, StudentFee, SalaryRecord
+
+
+class FinanceTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='principal@test.com', password='password', user_type='principal')
+        self.school = SchoolTenant.objects.create(name="Test School", owner=self.user, email="school@test.com")
+        self.manager = CustomUser.objects.create_user(email='manager@test.com', password='password', user_type='manager')
+        self.branch = Branch.objects.create(
+            name="Main Branch", school=self.school, city="Test City",
+            manager=self.manager, email="branch@test.com"
+        )
+        self.cls = Class.objects.create(name="Grade 1", branch=self.branch)
+        self.section = Section.objects.create(name="A", class_obj=self.cls)
+
+    def make_scholarship(self, name, **kwargs):
+        return Scholarship.objects.create(
+            name=name, branch=self.branch, school=self.school,
+            start_date=datetime.date(2026, 1, 1), **kwargs
+        )
+
+    def make_student(self, number, scholarship=None):
+        return Student.objects.create(
+            first_name=f"Student{number}", last_name="Doe",
+            admission_number=str(number), section=self.section,
+            is_active=True, scholarship=scholarship,
+        )
+
+
+class FeeGenerationTests(FinanceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.fee_structure = BranchFeeStructure.objects.create(
+            branch=self.branch, school=self.school,
+            frequency='monthly', monthly_amount=Decimal('1001.00'),
+        )
+        percentage = self.make_scholarship('Merit', scholarship_type='percentage', percentage_amount=Decimal('12.50'))
+        fixed = self.make_scholarship('Full', scholarship_type='fixed', fixed_amount=Decimal('5000.00'))
+        inactive = self.make_scholarship('Old', scholarship_type='fixed', fixed_amount=Decimal('50.00'), is_active=False)
+        self.students = {
+            'percentage': self.make_student(1, percentage),
+            'fixed': self.make_student(2, fixed),
+            'inactive': self.make_student(3, inactive),
+            'none': self.make_student(4),
+        }
+
+    def generate(self, **kwargs):
+        return StudentFee.generate_for_students(
+            Student.objects.filter(section=self.section),
+            branch=self.branch, school=self.school,
+            due_date=datetime.date(2026, 4, 1), **kwargs
+        )
+
+    def test_academic_fees_apply_active_scholarships(self):
+        """One fee per student; only active scholarships deduct, fixed ones capped at the fee"""
+        created = self.generate(fee_structure=self.fee_structure, label='April')
+        self.assertEqual(created, 4)
+        self.assertEqual(StudentFee.objects.count(), 4)
+
+        expected = {
+            'percentage': (Decimal('125.12'), Decimal('875.88')),
+            'fixed': (Decimal('1001.00'), Decimal('0.00')),
+            'inactive': (Decimal('0.00'), Decimal('1001.00')),
+            'none': (Decimal('0.00'), Decimal('1001.00')),
+        }
+        for key, (deduction, net) in expected.items():
+            fee = StudentFee.objects.get(student=self.students[key])
+            self.assertEqual(fee.amount, Decimal('1001.00'))
+            self.assertEqual(fee.scholarship_deduction, deduction, key)
+            self.assertEqual(fee.net_amount, net, key)
+            self.assertEqual(fee.fee_structure, self.fee_structure)
+
+    def test_special_fees_ignore_scholarships(self):
+        """Special fees charge the given amount to everyone"""
+        created = self.generate(fee_type='special', label='Trip', special_amount=Decimal('300.00'))
+        self.assertEqual(created, 4)
+        fees = StudentFee.objects.filter(fee_type='special')
+        self.assertEqual(set(fees.values_list('scholarship_deduction', flat=True)), {Decimal('0.00')})
+        self.assertEqual(set(fees.values_list('net_amount', flat=True)), {Decimal('300.00')})
+        self.assertFalse(fees.exclude(fee_structure=None).exists())
+
+
+class FeeStructureActivationTests(FinanceTestCase):
+    def make_structure(self, amount, **kwargs):
+        return BranchFeeStructure(
+            branch=self.branch, school=self.school,
+            frequency='monthly', monthly_amount=Decimal(amount), **kwargs
+        )
+
+    def active_amounts(self):
+        return list(BranchFeeStructure.objects.filter(branch=self.branch, is_active=True).values_list('monthly_amount', flat=True))
+
+    def test_activating_retires_the_other_structures(self):
+        self.make_structure('100.00').save()
+        self.make_structure('200.00').save()
+        self.assertEqual(self.active_amounts(), [Decimal('200.00')])
+
+    def test_bulk_created_instance_can_be_activated(self):
+        """Instances that never went through from_db still save"""
+        self.make_structure('100.00').save()
+        created = BranchFeeStructure.objects.bulk_create([self.make_structure('200.00', is_active=False)])[0]
+        created.is_active = True
+        created.save()
+        self.assertEqual(self.active_amounts(), [Decimal('200.00')])
+
+
+class ScholarshipDeductionTests(FinanceTestCase):
+    def test_percentage_rounds_to_cents(self):
+        """1234.55 * 33.33% = 411.475515, rounded to 411.48"""
+        scholarship = self.make_scholarship('Partial', scholarship_type='percentage', percentage_amount=Decimal('33.33'))
+        self.assertEqual(scholarship.calculate_deduction(Decimal('1234.55')), Decimal('411.48'))
+
+    def test_percentage_half_cent_rounds_to_even(self):
+        """Exact half cents round half-to-even, like Decimal.quantize"""
+        scholarship = self.make_scholarship('Half', scholarship_type='percentage', percentage_amount=Decimal('50.00'))
+        self.assertEqual(scholarship.calculate_deduction(Decimal('0.05')), Decimal('0.02'))
+        self.assertEqual(scholarship.calculate_deduction(Decimal('0.07')), Decimal('0.04'))
+
+    def test_fixed_is_capped_at_fee(self):
+        scholarship = self.make_scholarship('Fixed', scholarship_type='fixed', fixed_amount=Decimal('500.00'))
+        self.assertEqual(scholarship.calculate_deduction(Decimal('1000.00')), Decimal('500.00'))
+        self.assertEqual(scholarship.calculate_deduction(Decimal('300.00')), Decimal('300.00'))
+
+
+class RecordPaymentTests(FinanceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.fee = StudentFee.objects.create(
+            student=self.make_student(1), branch=self.branch, school=self.school,
+            amount=Decimal('1000.00'), due_date=datetime.date(2026, 4, 1),
+        )
+
+    def test_partial_payment(self):
+        self.fee.record_payment(Decimal('300.00'), self.user, notes='First')
+        self.fee.refresh_from_db()
+        self.assertEqual(self.fee.amount_paid, Decimal('300.00'))
+        self.assertEqual(self.fee.balance, Decimal('700.00'))
+        self.assertEqual(self.fee.status, 'partial')
+        self.assertIsNone(self.fee.paid_date)
+        self.assertEqual(self.fee.received_by, self.user)
+        self.assertEqual(self.fee.received_by_role, self.user.get_user_type_display())
+        self.assertEqual(self.fee.notes, 'First')
+
+    def test_overpayment_is_capped_and_marks_paid(self):
+        """Paying more than the balance caps amount_paid at net_amount"""
+        self.fee.record_payment(Decimal('600.00'), self.user, notes='First')
+        self.fee.record_payment(Decimal('600.00'), self.user, notes='Second')
+        self.fee.refresh_from_db()
+        self.assertEqual(self.fee.amount_paid, Decimal('1000.00'))
+        self.assertEqual(self.fee.balance, Decimal('0.00'))
+        self.assertEqual(self.fee.status, 'paid')
+        self.assertEqual(self.fee.paid_date, timezone.localdate())
+        self.assertEqual(self.fee.notes, 'First\nSecond')
+
+    def test_payment_adds_to_stored_total(self):
+        """The UPDATE adds to the row's value, not to a stale in-memory copy"""
+        stale = StudentFee.objects.get(pk=self.fee.pk)
+        self.fee.record_payment(Decimal('300.00'), self.user)
+        stale.record_payment(Decimal('200.00'), self.user)
+        self.fee.refresh_from_db()
+        self.assertEqual(self.fee.amount_paid, Decimal('500.00'))
+
+
+class MarkSalaryPaidTests(FinanceTestCase):
+    def make_record(self, employee, **kwargs):
+        return SalaryRecord.objects.create(
+            branch=self.branch, school=self.school, employee=employee,
+            employee_type='Manager', salary_amount=Decimal('50000.00'),
+            month=3, year=2026, **kwargs
+        )
+
+    def test_only_unpaid_records_change(self):
+        unpaid = self.make_record(self.manager)
+        paid_date = datetime.date(2026, 3, 31)
+        paid = self.make_record(
+            self.user, status='paid', payment_date=paid_date,
+            paid_by=self.manager, paid_by_role='Manager',
+        )
+
+        count = SalaryRecord.mark_paid(SalaryRecord.objects.filter(branch=self.branch), self.user)
+        self.assertEqual(count, 1)
+
+        unpaid.refresh_from_db()
+        self.assertEqual(unpaid.status, 'paid')
+        self.assertEqual(unpaid.payment_date, timezone.localdate())
+        self.assertEqual(unpaid.paid_by, self.user)
+        self.assertEqual(unpaid.paid_by_role, self.user.get_user_type_display())
 
-# Create your tests here.
+        paid.refresh_from_db()
+        self.assertEqual(paid.payment_date, paid_date)
+        self.assertEqual(paid.paid_by, self.manager)
+        self.assertEqual(paid.paid_by_role, 'Manager')
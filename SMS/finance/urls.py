@@ -22,6 +22,7 @@ urlpatterns = [
 
     # Fee Generation & List
     path('fees/', views.fee_list, name='fee_list'),
+    path('fees/export/', views.fee_list_csv, name='fee_list_csv'),
     path('fees/generate/', views.generate_fees, name='generate_fees'),
     path('fees/<int:fee_id>/', views.fee_detail, name='fee_detail'),
     path('fees/<int:fee_id>/pay/', views.record_payment, name='record_payment'),
@@ -1,27 +1,42 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.db import transaction
 from django.db.models import Sum, Q, Count, F
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from decimal import Decimal
 
-from .models import BranchFeeStructure, Scholarship, StudentFee, Expense, SalaryRecord
+from .models import (
+    BranchFeeStructure, Scholarship, StudentFee, Expense, SalaryRecord,
+    EXPENSE_CATEGORY_CHOICES,
+    FINANCE_DASHBOARD_CACHE_TIMEOUT, finance_dashboard_cache_key,
+    FEE_STATUS_KEYS, FEE_TYPE_KEYS, EXPENSE_CATEGORY_KEYS, SALARY_STATUS_KEYS,
+)
 from .forms import (
     BranchFeeStructureForm, ScholarshipForm, GenerateFeeForm, RecordPaymentForm,
     EditSpecialFeeForm, ExpenseForm, GenerateSalaryForm, EditSalaryForm,
 )
 from students.models import Student
 from academics.models import Class, Section
+from academics.signals import branch_sections_cache_key, CLASS_SECTIONS_CACHE_TIMEOUT
 from tenants.models import Branch
-from accounts.utils import get_user_branch, get_user_school, get_school_and_branch, branch_url
+from accounts.utils import get_user_branch, get_school_and_branch, branch_url
 from rbac.services import require_principal_or_manager
 from django.contrib.auth import get_user_model
 import calendar
+import csv
+import datetime
+import hashlib
 
 User = get_user_model()
 
+FEES_PER_PAGE = 50
+
 
 def _dash():
     return redirect('tenants:test_page')
@@ -48,87 +63,82 @@ def require_finance_access():
 
 # ═══ Dashboard ════════════════════════════════════════════════════
 
-@login_required
-@require_finance_access()
-def finance_dashboard(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
-    if not school or not branch:
-        return _dash()
-
-    fee_structure = BranchFeeStructure.objects.filter(branch=branch, is_active=True).first()
-    total_fees = StudentFee.objects.filter(branch=branch, is_active=True)
-    academic_fees = total_fees.filter(fee_type='academic')
-    special_fees = total_fees.filter(fee_type='special')
-    unpaid = total_fees.filter(status='unpaid')
-    partial = total_fees.filter(status='partial')
-    paid = total_fees.filter(status='paid')
-
-    total_collected = paid.aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-    partial_collected = partial.aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-    total_outstanding = unpaid.aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
-    partial_outstanding = partial.aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
-    partial_outstanding -= partial_collected
-
-    total_income = total_collected + partial_collected
-
-    scholarships = Scholarship.objects.filter(branch=branch, is_active=True)
-    total_scholarship_deductions = total_fees.aggregate(s=Sum('scholarship_deduction'))['s'] or Decimal('0')
+def _dashboard_kpis(branch):
+    """Aggregate figures for the finance dashboard (cached per branch)."""
+    fee_totals = StudentFee.objects.filter(branch=branch, is_active=True).totals(
+        academic_count=Count('id', filter=Q(fee_type='academic')),
+        special_count=Count('id', filter=Q(fee_type='special')),
+    )
+    total_income = fee_totals['collected']
+    total_receivable = fee_totals['billed']
 
     expenses_qs = Expense.objects.filter(branch=branch)
-    total_expenses = expenses_qs.aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    recent_expenses = expenses_qs.order_by('-expense_date')[:5]
-
-    from .models import EXPENSE_CATEGORY_CHOICES
-    top_expense_cats = []
-    for code, label in EXPENSE_CATEGORY_CHOICES:
-        amt = expenses_qs.filter(category=code).aggregate(s=Sum('amount'))['s'] or Decimal('0')
-        if amt:
-            top_expense_cats.append({'cat': label, 'amt': amt})
-    top_expense_cats.sort(key=lambda x: x['amt'], reverse=True)
+    total_expenses = expenses_qs.aggregate(s=Sum('amount', default=Decimal('0')))['s']
 
-    salaries_qs = SalaryRecord.objects.filter(branch=branch)
-    total_salaries_paid = salaries_qs.filter(status='paid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
-    total_salaries_pending = salaries_qs.filter(status='unpaid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
-    salary_employee_count = salaries_qs.values('employee').distinct().count()
+    # The database groups, ranks and limits; only the top five rows come back.
+    cat_labels = dict(EXPENSE_CATEGORY_CHOICES)
+    top_expense_cats = [
+        {'cat': cat_labels.get(code, code), 'amt': amt}
+        for code, amt in expenses_qs.values_list('category').annotate(
+            amt=Sum('amount')
+        ).filter(amt__gt=0).order_by('-amt')[:5]
+    ]
 
     now = timezone.now()
-    cur_month_salaries = salaries_qs.filter(month=now.month, year=now.year)
-    cur_salary_total = cur_month_salaries.aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
-    cur_salary_paid = cur_month_salaries.filter(status='paid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
-    cur_salary_unpaid = cur_salary_total - cur_salary_paid
-
-    net_profit = total_income - total_expenses - total_salaries_paid
-
-    total_receivable = total_fees.aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
-    collection_rate = (total_income / total_receivable * 100) if total_receivable else Decimal('0')
-
-    return render(request, 'finance/dashboard.html', {
-        'fee_structure': fee_structure,
-        'branch': branch,
-        'total_fees_count': total_fees.count(),
-        'academic_fees_count': academic_fees.count(),
-        'special_fees_count': special_fees.count(),
-        'unpaid_count': unpaid.count(),
-        'partial_count': partial.count(),
-        'paid_count': paid.count(),
+    current = Q(month=now.month, year=now.year)
+    salary_totals = SalaryRecord.objects.filter(branch=branch).aggregate(
+        paid=Sum('salary_amount', filter=Q(status='paid'), default=Decimal('0')),
+        pending=Sum('salary_amount', filter=Q(status='unpaid'), default=Decimal('0')),
+        employees=Count('employee', distinct=True),
+        cur_total=Sum('salary_amount', filter=current, default=Decimal('0')),
+        cur_paid=Sum('salary_amount', filter=current & Q(status='paid'), default=Decimal('0')),
+    )
+    total_salaries_paid = salary_totals['paid']
+    cur_salary_total = salary_totals['cur_total']
+    cur_salary_paid = salary_totals['cur_paid']
+
+    return {
+        'academic_fees_count': fee_totals['academic_count'],
+        'special_fees_count': fee_totals['special_count'],
+        'unpaid_count': fee_totals['unpaid_count'],
+        'partial_count': fee_totals['partial_count'],
+        'paid_count': fee_totals['paid_count'],
         'total_income': total_income,
-        'total_outstanding': total_outstanding + partial_outstanding,
+        'total_outstanding': fee_totals['outstanding'],
         'total_receivable': total_receivable,
-        'collection_rate': collection_rate,
-        'scholarships_count': scholarships.count(),
-        'total_scholarship_deductions': total_scholarship_deductions,
+        'collection_rate': (total_income / total_receivable * 100) if total_receivable else Decimal('0'),
+        'scholarships_count': Scholarship.objects.filter(branch=branch, is_active=True).count(),
+        'total_scholarship_deductions': fee_totals['scholarship'],
         'total_expenses': total_expenses,
-        'recent_expenses': recent_expenses,
-        'top_expense_cats': top_expense_cats[:5],
+        'top_expense_cats': top_expense_cats,
         'total_salaries_paid': total_salaries_paid,
-        'total_salaries_pending': total_salaries_pending,
-        'salary_employee_count': salary_employee_count,
+        'total_salaries_pending': salary_totals['pending'],
+        'salary_employee_count': salary_totals['employees'],
         'cur_month_name': calendar.month_name[now.month],
         'cur_salary_total': cur_salary_total,
         'cur_salary_paid': cur_salary_paid,
-        'cur_salary_unpaid': cur_salary_unpaid,
-        'net_profit': net_profit,
+        'cur_salary_unpaid': cur_salary_total - cur_salary_paid,
+        'net_profit': total_income - total_expenses - total_salaries_paid,
+    }
+
+
+@login_required
+@require_finance_access()
+def finance_dashboard(request):
+    school, branch = get_school_and_branch(request)
+    if not school or not branch:
+        return _dash()
+
+    # Cleared by finance.signals (and the bulk write helpers) on every write.
+    kpis = cache.get_or_set(
+        finance_dashboard_cache_key(branch.id), lambda: _dashboard_kpis(branch), FINANCE_DASHBOARD_CACHE_TIMEOUT,
+    )
+
+    return render(request, 'finance/dashboard.html', {
+        **kpis,
+        'fee_structure': BranchFeeStructure.get_active(branch.id),
+        'branch': branch,
+        'recent_expenses': Expense.objects.filter(branch=branch).order_by('-expense_date')[:5],
         'title': 'Finance Dashboard',
     })
 
@@ -138,13 +148,13 @@ def finance_dashboard(request):
 @login_required
 @require_principal_or_manager()
 def fee_structure_detail(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
-    fee_structure = BranchFeeStructure.objects.filter(branch=branch, is_active=True).first()
-    all_structures = BranchFeeStructure.objects.filter(branch=branch).order_by('-created_at')
+    # A branch has a handful of structures; the active one is among them.
+    all_structures = list(BranchFeeStructure.objects.filter(branch=branch).order_by('-created_at'))
+    fee_structure = next((fs for fs in all_structures if fs.is_active), None)
 
     return render(request, 'finance/fee_structure_detail.html', {
         'fee_structure': fee_structure,
@@ -157,8 +167,7 @@ def fee_structure_detail(request):
 @login_required
 @require_principal_or_manager()
 def edit_fee_structure(request, fs_id=None):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -170,7 +179,11 @@ def edit_fee_structure(request, fs_id=None):
             fs = form.save(commit=False)
             fs.branch = branch
             fs.school = school
-            fs.save()
+            if instance:
+                # installment_amount is derived in save() from the form values.
+                fs.save(update_fields=[*form.changed_data, 'installment_amount', 'updated_at'])
+            else:
+                fs.save()
             messages.success(request, 'Fee structure saved.')
             return redirect(branch_url(request, 'finance:fee_structure_detail'))
     else:
@@ -187,8 +200,7 @@ def edit_fee_structure(request, fs_id=None):
 @login_required
 @require_principal_or_manager()
 def scholarship_list(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -201,8 +213,7 @@ def scholarship_list(request):
 @login_required
 @require_principal_or_manager()
 def create_scholarship(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -227,8 +238,7 @@ def create_scholarship(request):
 @login_required
 @require_principal_or_manager()
 def edit_scholarship(request, pk):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -236,7 +246,7 @@ def edit_scholarship(request, pk):
     if request.method == 'POST':
         form = ScholarshipForm(request.POST, instance=scholarship)
         if form.is_valid():
-            form.save()
+            form.save(commit=False).save(update_fields=[*form.changed_data, 'updated_at'])
             messages.success(request, f'Scholarship "{scholarship.name}" updated.')
             return redirect(branch_url(request, 'finance:scholarship_list'))
     else:
@@ -251,15 +261,14 @@ def edit_scholarship(request, pk):
 @login_required
 @require_principal_or_manager()
 def delete_scholarship(request, pk):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
     scholarship = get_object_or_404(Scholarship, pk=pk, branch=branch)
     if request.method == 'POST':
         scholarship.is_active = False
-        scholarship.save()
+        scholarship.save(update_fields=['is_active', 'updated_at'])
         messages.success(request, f'Scholarship "{scholarship.name}" deactivated.')
         return redirect(branch_url(request, 'finance:scholarship_list'))
 
@@ -270,21 +279,47 @@ def delete_scholarship(request, pk):
 
 # ═══ AJAX ═════════════════════════════════════════════════════════
 
+def _branch_section_rows(branch):
+    """Ordered (id, name, class id, class name) rows of the branch's active sections."""
+    # Section rows only change when a Class/Section is edited (see
+    # academics.signals); a class's sections keep their name order.
+    cache_key = branch_sections_cache_key(branch.id)
+    rows = cache.get(cache_key)
+    if rows is None:
+        rows = list(
+            # Same set GenerateFeeForm accepts: no sections of inactive classes.
+            Section.objects.filter(class_obj__branch=branch, class_obj__is_active=True, is_active=True)
+            .order_by('class_obj__numeric_level', 'name')
+            .values_list('id', 'name', 'class_obj_id', 'class_obj__name')
+        )
+        cache.set(cache_key, rows, CLASS_SECTIONS_CACHE_TIMEOUT)
+    return rows
+
+
+def _sections_etag(request):
+    """ETag of api_sections_for_class: the branch's section rows plus the class filter."""
+    branch = get_user_branch(request.user, request)
+    if not branch:
+        return None
+    digest = hashlib.md5(repr(_branch_section_rows(branch)).encode(), usedforsecurity=False).hexdigest()
+    return f"{branch.id}-{request.GET.get('class_id', '')}-{digest}"
+
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_sections_etag)
 def api_sections_for_class(request):
     """Return sections for a given class within the user's branch.
     If class_id is empty, returns ALL sections for the branch (with class prefix)."""
     branch = get_user_branch(request.user, request)
     if not branch:
         return JsonResponse({'sections': []})
+    rows = _branch_section_rows(branch)
     class_id = request.GET.get('class_id')
-    qs = Section.objects.filter(class_obj__branch=branch, is_active=True)
     if class_id:
-        qs = qs.filter(class_obj_id=class_id)
-        sections = list(qs.order_by('name').values('id', 'name'))
+        sections = [{'id': i, 'name': n} for i, n, c, _ in rows if str(c) == class_id]
     else:
-        raw = qs.order_by('class_obj__numeric_level', 'name').values('id', 'name', 'class_obj__name')
-        sections = [{'id': s['id'], 'name': f"{s['class_obj__name']} - {s['name']}"} for s in raw]
+        sections = [{'id': i, 'name': f"{cn} - {n}"} for i, n, _, cn in rows]
     return JsonResponse({'sections': sections})
 
 
@@ -293,12 +328,11 @@ def api_sections_for_class(request):
 @login_required
 @require_finance_access()
 def generate_fees(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
-    fee_structure = BranchFeeStructure.objects.filter(branch=branch, is_active=True).first()
+    fee_structure = BranchFeeStructure.get_active(branch.id)
 
     if request.method == 'POST':
         form = GenerateFeeForm(request.POST, branch=branch)
@@ -314,48 +348,22 @@ def generate_fees(request):
             if cd.get('section_filter'):
                 students_qs = students_qs.filter(section=cd['section_filter'])
 
-            created = 0
-            with transaction.atomic():
-                for student in students_qs:
-                    if fee_type == 'special':
-                        amount = cd['special_fee_amount']
-                        StudentFee.objects.create(
-                            fee_type='special',
-                            student=student,
-                            fee_structure=None,
-                            branch=branch,
-                            school=school,
-                            amount=amount,
-                            scholarship_deduction=Decimal('0'),
-                            net_amount=amount,
-                            due_date=cd['due_date'],
-                            label=cd.get('special_fee_name', ''),
-                            created_by=request.user,
-                        )
-                    else:
-                        if not fee_structure:
-                            messages.error(request, 'No active fee structure for academic fees.')
-                            return redirect(branch_url(request, 'finance:fee_structure_detail'))
-                        amount = fee_structure.per_fee_amount
-                        scholarship_deduction = Decimal('0')
-                        if student.scholarship and student.scholarship.is_active:
-                            scholarship_deduction = student.scholarship.calculate_deduction(amount)
-                        net = amount - scholarship_deduction
-                        StudentFee.objects.create(
-                            fee_type='academic',
-                            student=student,
-                            fee_structure=fee_structure,
-                            branch=branch,
-                            school=school,
-                            amount=amount,
-                            scholarship_deduction=scholarship_deduction,
-                            net_amount=net,
-                            due_date=cd['due_date'],
-                            label=cd.get('label', ''),
-                            installment_number=cd.get('installment_number'),
-                            created_by=request.user,
-                        )
-                    created += 1
+            if fee_type != 'special' and not fee_structure:
+                messages.error(request, 'No active fee structure for academic fees.')
+                return redirect(branch_url(request, 'finance:fee_structure_detail'))
+
+            created = StudentFee.generate_for_students(
+                students_qs,
+                branch=branch,
+                school=school,
+                due_date=cd['due_date'],
+                fee_structure=fee_structure,
+                fee_type='special' if fee_type == 'special' else 'academic',
+                label=cd.get('special_fee_name', '') if fee_type == 'special' else cd.get('label', ''),
+                installment_number=cd.get('installment_number'),
+                special_amount=cd.get('special_fee_amount'),
+                created_by=request.user,
+            )
 
             fee_label = 'special' if fee_type == 'special' else 'academic'
             messages.success(request, f'{fee_label.title()} fees generated for {created} student(s).')
@@ -371,25 +379,21 @@ def generate_fees(request):
 
 # ═══ Fee List & Management ════════════════════════════════════════
 
-@login_required
-@require_finance_access()
-def fee_list(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
-    if not school or not branch:
-        return _dash()
-
-    fees = StudentFee.objects.filter(branch=branch, is_active=True).select_related(
-        'student', 'student__section', 'student__section__class_obj', 'received_by'
-    )
+def _filtered_fees(request, branch):
+    """
+    The branch's active fees narrowed by fee_list's GET filters.
+    Returns (queryset, filters) where `filters` echoes the raw values.
+    """
+    fees = StudentFee.objects.filter(branch=branch, is_active=True)
 
+    # An unknown choice value can't match any row; skip the query.
     fee_type_filter = request.GET.get('fee_type', '')
     if fee_type_filter:
-        fees = fees.filter(fee_type=fee_type_filter)
+        fees = fees.filter(fee_type=fee_type_filter) if fee_type_filter in FEE_TYPE_KEYS else fees.none()
 
     status = request.GET.get('status', '')
     if status:
-        fees = fees.filter(status=status)
+        fees = fees.filter(status=status) if status in FEE_STATUS_KEYS else fees.none()
 
     class_id = request.GET.get('class_id', '')
     if class_id:
@@ -399,7 +403,8 @@ def fee_list(request):
     if section_id:
         fees = fees.filter(student__section_id=section_id)
 
-    search = request.GET.get('search', '')
+    # A whitespace-only search would still run three LIKE scans.
+    search = request.GET.get('search', '').strip()
     if search:
         fees = fees.filter(
             Q(student__first_name__icontains=search) |
@@ -407,38 +412,94 @@ def fee_list(request):
             Q(student__admission_number__icontains=search)
         )
 
-    fees = fees.order_by('-due_date', 'student__first_name')
+    return fees, {
+        'fee_type': fee_type_filter, 'status': status,
+        'class_id': class_id, 'section_id': section_id, 'search': search,
+    }
+
+
+@login_required
+@require_finance_access()
+def fee_list(request):
+    school, branch = get_school_and_branch(request)
+    if not school or not branch:
+        return _dash()
 
+    fees, filters = _filtered_fees(request, branch)
     classes = Class.objects.filter(branch=branch, is_active=True).order_by('numeric_level')
 
     summary = fees.aggregate(
+        count=Count('id'),
         total_net=Sum('net_amount'),
         total_paid=Sum('amount_paid'),
     )
 
+    fees = fees.select_related(*StudentFee.LIST_SELECT_RELATED).only(*StudentFee.LIST_FIELDS).order_by(
+        '-due_date', 'student__first_name'
+    )
+    paginator = Paginator(fees, FEES_PER_PAGE)
+    # The summary query already counted the rows; don't COUNT(*) again.
+    paginator.count = summary['count']
+    page_obj = paginator.get_page(request.GET.get('page'))
+
     return render(request, 'finance/fee_list.html', {
-        'fees': fees, 'classes': classes, 'branch': branch,
-        'selected_fee_type': fee_type_filter,
-        'selected_status': status, 'selected_class': class_id,
-        'selected_section': section_id, 'search_query': search,
+        'fees': page_obj, 'page_obj': page_obj, 'classes': classes, 'branch': branch,
+        'selected_fee_type': filters['fee_type'],
+        'selected_status': filters['status'], 'selected_class': filters['class_id'],
+        'selected_section': filters['section_id'], 'search_query': filters['search'],
         'summary': summary,
         'title': 'Student Fees',
     })
 
 
+class _Echo:
+    """File-like object whose write() hands the line back, for csv.writer streaming."""
+
+    def write(self, value):
+        return value
+
+
+@login_required
+@require_finance_access()
+def fee_list_csv(request):
+    """fee_list's filtered rows as a streamed CSV download."""
+    school, branch = get_school_and_branch(request)
+    if not school or not branch:
+        return _dash()
+
+    fees, _ = _filtered_fees(request, branch)
+    rows = fees.order_by('-due_date', 'student__first_name').values_list(
+        'student__admission_number', 'student__first_name', 'student__last_name',
+        'student__section__class_obj__name', 'student__section__name',
+        'fee_type', 'label', 'amount', 'scholarship_deduction', 'net_amount',
+        'amount_paid', 'balance', 'status', 'due_date',
+    )
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow([
+            'Admission No', 'First Name', 'Last Name', 'Class', 'Section', 'Type', 'Label',
+            'Amount', 'Discount', 'Net', 'Paid', 'Balance', 'Status', 'Due Date',
+        ])
+        for row in rows.iterator(chunk_size=2000):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="fees-{branch.id}-{timezone.localdate()}.csv"'
+    return response
+
+
 @login_required
 @require_finance_access()
 def fee_detail(request, fee_id):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
     fee = get_object_or_404(
         StudentFee.objects.select_related(
-            'student', 'student__section', 'student__section__class_obj',
-            'student__scholarship', 'fee_structure', 'received_by', 'created_by'
-        ),
+            *StudentFee.LIST_SELECT_RELATED, 'student__scholarship', 'received_by', 'created_by'
+        ).only(*StudentFee.DETAIL_FIELDS),
         id=fee_id, branch=branch
     )
 
@@ -450,8 +511,7 @@ def fee_detail(request, fee_id):
 @login_required
 @require_finance_access()
 def edit_special_fee(request, fee_id):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -463,9 +523,8 @@ def edit_special_fee(request, fee_id):
             cd = form.cleaned_data
             fee.label = cd['special_fee_name']
             fee.amount = cd['amount']
-            fee.net_amount = cd['amount']
             fee.due_date = cd['due_date']
-            fee.save()
+            fee.save(update_fields=['label', 'amount', 'due_date', 'updated_at'])
             messages.success(request, f'Special fee "{cd["special_fee_name"]}" updated for {fee.student.full_name}.')
             return redirect(branch_url(request, 'finance:fee_detail', fee_id=fee.id))
     else:
@@ -484,8 +543,7 @@ def edit_special_fee(request, fee_id):
 @login_required
 @require_finance_access()
 def delete_special_fee(request, fee_id):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -507,8 +565,7 @@ def delete_special_fee(request, fee_id):
 @login_required
 @require_finance_access()
 def record_payment(request, fee_id):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -524,22 +581,9 @@ def record_payment(request, fee_id):
         form = RecordPaymentForm(request.POST, max_amount=balance)
         if form.is_valid():
             amount = form.cleaned_data['amount']
-            payment_type = form.cleaned_data['payment_type']
-            notes = form.cleaned_data.get('notes', '')
-            if notes:
-                fee.notes = (fee.notes + '\n' + notes).strip() if fee.notes else notes
-
-            fee.amount_paid += Decimal(str(amount))
-            if payment_type == 'full' or fee.amount_paid >= fee.net_amount:
-                fee.amount_paid = fee.net_amount
-                fee.status = 'paid'
-                fee.paid_date = timezone.now().date()
-            else:
-                fee.status = 'partial'
-
-            fee.received_by = request.user
-            fee.received_by_role = request.user.get_user_type_display()
-            fee.save()
+            # The form only accepts 'full' for the whole balance, so the
+            # model's UPDATE marks it paid the same way.
+            fee.record_payment(amount, request.user, notes=form.cleaned_data.get('notes', ''))
 
             status_label = 'Paid in Full' if fee.status == 'paid' else 'Partial Payment'
             messages.success(
@@ -562,16 +606,12 @@ def record_payment(request, fee_id):
 @login_required
 @require_finance_access()
 def fee_receipt(request, fee_id):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
     fee = get_object_or_404(
-        StudentFee.objects.select_related(
-            'student', 'student__section', 'student__section__class_obj',
-            'fee_structure', 'received_by', 'branch', 'school'
-        ),
+        StudentFee.objects.select_related(*StudentFee.DETAIL_SELECT_RELATED),
         id=fee_id, branch=branch
     )
 
@@ -586,8 +626,7 @@ def fee_receipt(request, fee_id):
 @login_required
 @require_finance_access()
 def expense_list(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -595,7 +634,7 @@ def expense_list(request):
 
     cat = request.GET.get('category', '')
     if cat:
-        expenses = expenses.filter(category=cat)
+        expenses = expenses.filter(category=cat) if cat in EXPENSE_CATEGORY_KEYS else expenses.none()
 
     search = request.GET.get('search', '')
     if search:
@@ -603,7 +642,6 @@ def expense_list(request):
 
     total = expenses.aggregate(s=Sum('amount'))['s'] or Decimal('0')
 
-    from .models import EXPENSE_CATEGORY_CHOICES
     return render(request, 'finance/expense_list.html', {
         'expenses': expenses, 'total': total, 'branch': branch,
         'categories': EXPENSE_CATEGORY_CHOICES,
@@ -615,8 +653,7 @@ def expense_list(request):
 @login_required
 @require_finance_access()
 def create_expense(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -641,8 +678,7 @@ def create_expense(request):
 @login_required
 @require_finance_access()
 def edit_expense(request, pk):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -650,7 +686,7 @@ def edit_expense(request, pk):
     if request.method == 'POST':
         form = ExpenseForm(request.POST, instance=expense)
         if form.is_valid():
-            form.save()
+            form.save(commit=False).save(update_fields=[*form.changed_data, 'updated_at'])
             messages.success(request, f'Expense "{expense.title}" updated.')
             return redirect(branch_url(request, 'finance:expense_list'))
     else:
@@ -665,8 +701,7 @@ def edit_expense(request, pk):
 @login_required
 @require_finance_access()
 def delete_expense(request, pk):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -685,7 +720,11 @@ def delete_expense(request, pk):
 # ═══ Salary ═══════════════════════════════════════════════════════
 
 def _get_branch_employees(branch):
-    """Return all employees of a branch with their salary amount and type."""
+    """
+    Return all employees of a branch with their salary amount and type.
+    Only the columns the salary pages use are loaded: the salary, the
+    Employee type and the user's full_name.
+    """
     from staff.models import Teacher, Accountant, Employee
     employees = []
 
@@ -696,21 +735,27 @@ def _get_branch_employees(branch):
             'salary': branch.manager_salary or Decimal('0'),
         })
 
-    for t in Teacher.objects.filter(branch=branch, is_active=True).select_related('user'):
+    for t in Teacher.objects.filter(branch=branch, is_active=True).select_related('user').only(
+            'salary', 'user__full_name'
+    ):
         employees.append({
             'user': t.user,
             'type': 'Teacher',
             'salary': t.salary or Decimal('0'),
         })
 
-    for a in Accountant.objects.filter(branch=branch, is_active=True).select_related('user'):
+    for a in Accountant.objects.filter(branch=branch, is_active=True).select_related('user').only(
+            'salary', 'user__full_name'
+    ):
         employees.append({
             'user': a.user,
             'type': 'Accountant',
             'salary': a.salary or Decimal('0'),
         })
 
-    for e in Employee.objects.filter(branch=branch, is_active=True).select_related('user'):
+    for e in Employee.objects.filter(branch=branch, is_active=True).select_related('user').only(
+            'salary', 'employee_type', 'user__full_name'
+    ):
         employees.append({
             'user': e.user,
             'type': e.get_employee_type_display(),
@@ -723,12 +768,14 @@ def _get_branch_employees(branch):
 @login_required
 @require_finance_access()
 def salary_list(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
-    records = SalaryRecord.objects.filter(branch=branch).select_related('employee', 'paid_by')
+    records = SalaryRecord.objects.filter(branch=branch).select_related('employee', 'paid_by').only(
+        'employee_type', 'month', 'year', 'salary_amount', 'status', 'payment_date', 'paid_by_role',
+        'employee__full_name', 'paid_by__full_name',
+    ).order_by('-year', '-month', 'employee__full_name')
 
     month_f = request.GET.get('month', '')
     year_f = request.GET.get('year', '')
@@ -739,7 +786,7 @@ def salary_list(request):
     if year_f:
         records = records.filter(year=int(year_f))
     if status_f:
-        records = records.filter(status=status_f)
+        records = records.filter(status=status_f) if status_f in SALARY_STATUS_KEYS else records.none()
 
     total_salary = records.aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
     total_paid = records.filter(status='paid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
@@ -756,8 +803,7 @@ def salary_list(request):
 @login_required
 @require_finance_access()
 def generate_salary(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -767,28 +813,11 @@ def generate_salary(request):
             month = int(form.cleaned_data['month'])
             year = int(form.cleaned_data['year'])
 
-            employees = _get_branch_employees(branch)
-            created = 0
-            skipped = 0
             with transaction.atomic():
-                for emp in employees:
-                    if not emp['user']:
-                        continue
-                    exists = SalaryRecord.objects.filter(
-                        employee=emp['user'], month=month, year=year
-                    ).exists()
-                    if exists:
-                        skipped += 1
-                        continue
-                    SalaryRecord.objects.create(
-                        branch=branch, school=school,
-                        employee=emp['user'],
-                        employee_type=emp['type'],
-                        salary_amount=emp['salary'],
-                        month=month, year=year,
-                        created_by=request.user,
-                    )
-                    created += 1
+                created, skipped = SalaryRecord.generate_for_month(
+                    branch, school, month, year, _get_branch_employees(branch),
+                    created_by=request.user,
+                )
 
             msg = f'Salary records generated for {created} employee(s) for {calendar.month_name[month]} {year}.'
             if skipped:
@@ -808,8 +837,7 @@ def generate_salary(request):
 @login_required
 @require_finance_access()
 def edit_salary(request, pk):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -820,7 +848,7 @@ def edit_salary(request, pk):
         if form.is_valid():
             record.salary_amount = form.cleaned_data['salary_amount']
             record.description = form.cleaned_data.get('description', '')
-            record.save()
+            record.save(update_fields=['salary_amount', 'description', 'updated_at'])
             messages.success(request, f'Salary record for {record.employee.full_name} updated.')
             return redirect(branch_url(request, 'finance:salary_list') + f'?month={record.month}&year={record.year}')
     else:
@@ -838,8 +866,7 @@ def edit_salary(request, pk):
 @login_required
 @require_finance_access()
 def delete_salary(request, pk):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -859,8 +886,7 @@ def delete_salary(request, pk):
 @require_finance_access()
 def pay_salary(request):
     """Page to pay salaries for a specific month/year. Lists all unpaid records."""
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -879,20 +905,10 @@ def pay_salary(request):
     ).select_related('employee').order_by('employee__full_name')
 
     if request.method == 'POST':
-        salary_ids = request.POST.getlist('salary_ids')
-        paid_count = 0
-        with transaction.atomic():
-            for sid in salary_ids:
-                try:
-                    rec = SalaryRecord.objects.get(pk=int(sid), branch=branch, status='unpaid')
-                    rec.status = 'paid'
-                    rec.payment_date = timezone.now().date()
-                    rec.paid_by = request.user
-                    rec.paid_by_role = request.user.get_user_type_display()
-                    rec.save()
-                    paid_count += 1
-                except SalaryRecord.DoesNotExist:
-                    continue
+        salary_ids = [int(sid) for sid in request.POST.getlist('salary_ids') if sid.isdigit()]
+        paid_count = SalaryRecord.mark_paid(
+            SalaryRecord.objects.filter(pk__in=salary_ids, branch=branch), request.user
+        )
 
         messages.success(request, f'{paid_count} salary(ies) marked as paid for {calendar.month_name[month]} {year}.')
         return redirect(branch_url(request, 'finance:pay_salary') + f'?month={month}&year={year}')
@@ -916,8 +932,7 @@ def pay_salary(request):
 @login_required
 @require_finance_access()
 def financial_report(request):
-    school = get_user_school(request.user, request)
-    branch = get_user_branch(request.user, request)
+    school, branch = get_school_and_branch(request)
     if not school or not branch:
         return _dash()
 
@@ -937,49 +952,32 @@ def financial_report(request):
         expenses_qs = expenses_qs.filter(expense_date__lte=date_to)
         salaries_qs = salaries_qs.filter(payment_date__lte=date_to)
 
-    total_collected = fees_qs.filter(
-        status__in=['paid', 'partial']
-    ).aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-
-    total_pending = fees_qs.exclude(
-        status='paid'
-    ).aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
-    total_paid_towards_pending = fees_qs.exclude(
-        status='paid'
-    ).aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-    total_pending -= total_paid_towards_pending
-
-    total_expenses = expenses_qs.aggregate(s=Sum('amount'))['s'] or Decimal('0')
-    total_salaries = salaries_qs.filter(status='paid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
-    total_salaries_pending = salaries_qs.filter(status='unpaid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
+    fee_totals = fees_qs.totals()
+    academic = fees_qs.filter(fee_type='academic').totals()
+    special = fees_qs.filter(fee_type='special').totals()
+    total_collected = fee_totals['collected']
+    total_pending = fee_totals['outstanding']
+
+    salary_totals = salaries_qs.aggregate(
+        paid=Sum('salary_amount', filter=Q(status='paid'), default=Decimal('0')),
+        unpaid=Sum('salary_amount', filter=Q(status='unpaid'), default=Decimal('0')),
+    )
+    total_expenses = expenses_qs.aggregate(s=Sum('amount', default=Decimal('0')))['s']
+    total_salaries = salary_totals['paid']
+    total_salaries_pending = salary_totals['unpaid']
     net_profit = total_collected - total_expenses - total_salaries
     total_outflow = total_expenses + total_salaries
 
-    total_receivable = fees_qs.aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
+    total_receivable = fee_totals['billed']
     collection_rate = (total_collected / total_receivable * 100) if total_receivable else Decimal('0')
 
-    total_scholarship_given = fees_qs.aggregate(s=Sum('scholarship_deduction'))['s'] or Decimal('0')
-
-    # Fee type breakdown
-    academic_count = fees_qs.filter(fee_type='academic').count()
-    special_count = fees_qs.filter(fee_type='special').count()
-    academic_collected = fees_qs.filter(fee_type='academic', status__in=['paid', 'partial']).aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-    special_collected = fees_qs.filter(fee_type='special', status__in=['paid', 'partial']).aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-    academic_pending = fees_qs.filter(fee_type='academic').exclude(status='paid').aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
-    academic_pending -= fees_qs.filter(fee_type='academic').exclude(status='paid').aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-    special_pending = fees_qs.filter(fee_type='special').exclude(status='paid').aggregate(s=Sum('net_amount'))['s'] or Decimal('0')
-    special_pending -= fees_qs.filter(fee_type='special').exclude(status='paid').aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-
-    # Fee status counts
-    paid_count = fees_qs.filter(status='paid').count()
-    partial_count = fees_qs.filter(status='partial').count()
-    unpaid_count = fees_qs.filter(status='unpaid').count()
-
-    # Expense category breakdown
-    from .models import EXPENSE_CATEGORY_CHOICES
+    total_scholarship_given = fee_totals['scholarship']
+
+    # Expense category breakdown (choice order, then largest first)
+    cat_amounts = dict(expenses_qs.values_list('category').annotate(s=Sum('amount')))
     expense_by_cat = []
     for code, label in EXPENSE_CATEGORY_CHOICES:
-        amt = expenses_qs.filter(category=code).aggregate(s=Sum('amount'))['s'] or Decimal('0')
+        amt = cat_amounts.get(code)
         if amt:
             pct = (amt / total_expenses * 100) if total_expenses else Decimal('0')
             expense_by_cat.append({'category': label, 'amount': amt, 'pct': pct})
@@ -996,22 +994,46 @@ def financial_report(request):
         item['paid'] = item['paid'] or Decimal('0')
         item['unpaid'] = item['unpaid'] or Decimal('0')
 
-    # Monthly trends (last 6 months)
-    monthly_data = []
+    # Monthly trends (last 6 months): one grouped query per model
     now = timezone.now()
+    months = []
     for offset in range(5, -1, -1):
         m = now.month - offset
         y = now.year
         while m <= 0:
             m += 12
             y -= 1
-        month_label = f"{calendar.month_abbr[m]} {y}"
-        m_fees = StudentFee.objects.filter(branch=branch, is_active=True, due_date__month=m, due_date__year=y)
-        m_income = m_fees.filter(status__in=['paid', 'partial']).aggregate(s=Sum('amount_paid'))['s'] or Decimal('0')
-        m_expense = Expense.objects.filter(branch=branch, expense_date__month=m, expense_date__year=y).aggregate(s=Sum('amount'))['s'] or Decimal('0')
-        m_salary = SalaryRecord.objects.filter(branch=branch, month=m, year=y, status='paid').aggregate(s=Sum('salary_amount'))['s'] or Decimal('0')
+        months.append((y, m))
+    period = Q()
+    for y, m in months:
+        period |= Q(year=y, month=m)
+    first = datetime.date(months[0][0], months[0][1], 1)
+    last = datetime.date(now.year, now.month, calendar.monthrange(now.year, now.month)[1])
+
+    income_by_month = {
+        (row['due_date__year'], row['due_date__month']): row['s']
+        for row in StudentFee.objects.filter(
+            branch=branch, is_active=True, status__in=['paid', 'partial'], due_date__range=(first, last),
+        ).values('due_date__year', 'due_date__month').annotate(s=Sum('amount_paid'))
+    }
+    expense_by_month = {
+        (row['expense_date__year'], row['expense_date__month']): row['s']
+        for row in Expense.objects.filter(
+            branch=branch, expense_date__range=(first, last),
+        ).values('expense_date__year', 'expense_date__month').annotate(s=Sum('amount'))
+    }
+    salary_by_month = {
+        (row['year'], row['month']): row['s']
+        for row in SalaryRecord.objects.filter(period, branch=branch, status='paid')
+        .values('year', 'month').annotate(s=Sum('salary_amount'))
+    }
+    monthly_data = []
+    for y, m in months:
+        m_income = income_by_month.get((y, m)) or Decimal('0')
+        m_expense = expense_by_month.get((y, m)) or Decimal('0')
+        m_salary = salary_by_month.get((y, m)) or Decimal('0')
         monthly_data.append({
-            'label': month_label,
+            'label': f"{calendar.month_abbr[m]} {y}",
             'income': m_income,
             'expense': m_expense,
             'salary': m_salary,
@@ -1023,10 +1045,10 @@ def financial_report(request):
         fees_qs.exclude(status='paid')
         .values('student__first_name', 'student__last_name', 'student__id')
         .annotate(
-            balance=Sum(F('net_amount') - F('amount_paid')),
+            outstanding=Sum('balance'),
             fee_count=Count('id'),
         )
-        .order_by('-balance')[:10]
+        .order_by('-outstanding')[:10]
     )
 
     return render(request, 'finance/financial_report.html', {
@@ -1041,16 +1063,16 @@ def financial_report(request):
         'total_receivable': total_receivable,
         'collection_rate': collection_rate,
         'total_scholarship_given': total_scholarship_given,
-        'academic_count': academic_count,
-        'special_count': special_count,
-        'academic_collected': academic_collected,
-        'special_collected': special_collected,
-        'academic_pending': academic_pending,
-        'special_pending': special_pending,
-        'paid_count': paid_count,
-        'partial_count': partial_count,
-        'unpaid_count': unpaid_count,
-        'total_fees_count': fees_qs.count(),
+        'academic_count': academic['count'],
+        'special_count': special['count'],
+        'academic_collected': academic['collected'],
+        'special_collected': special['collected'],
+        'academic_pending': academic['outstanding'],
+        'special_pending': special['outstanding'],
+        'paid_count': fee_totals['paid_count'],
+        'partial_count': fee_totals['partial_count'],
+        'unpaid_count': fee_totals['unpaid_count'],
+        'total_fees_count': fee_totals['count'],
         'expense_by_cat': expense_by_cat,
         'salary_by_type': salary_by_type,
         'monthly_data': monthly_data,
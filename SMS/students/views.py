@@ -280,7 +280,7 @@ def student_detail(request, student_id):
         messages.error(request, "No branch associated with your account.")
         return _get_dashboard_redirect()
     student = get_object_or_404(
-        Student.objects.select_related('section', 'section__class_obj', 'user')
+        Student.objects.select_related('section', 'section__class_obj', 'user', 'scholarship')
         .prefetch_related('parents', 'parents__user'),
         id=student_id,
         section__class_obj__branch=branch